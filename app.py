@@ -1,27 +1,74 @@
 import customtkinter as ctk
-from tkinter import filedialog, Menu
-from PIL import Image
+import tkinter
+from tkinter import filedialog, Menu, messagebox
+import json
+import multiprocessing
 import os
+import queue
 import subprocess
 import threading
 import time
 import random
+import sys
 from game_manager import GameManager
 from settings_manager import SettingsManager
-from metadata_fetcher import fetch_metadata
+from metadata_fetcher import get_client
 from music_manager import MusicManager
-from sound_manager import SoundManager
+from music_library import MusicLibrary, MusicScanner, format_duration
+from loudness import LoudnessAnalyzer
 from tray_icon import TrayIcon
-from controller_manager import ControllerManager
 from theme_editor import ThemeEditorDialog
 from chat_client import ChatClient
 from friends_ui import FriendsPanel
-import cv2
+from library_view import VirtualList
+from image_cache import icon_cache, blank_image
+from persistence import WriteBehindPersister
+from library_scanner import LibraryScanner
+from process_supervisor import GameSupervisor
+from session_log import SessionLog
+from video_cache import VideoCache
+from boot import BootScheduler
+from storage import open_storage
+from view_snapshot import LibrarySnapshot
 
 # Configuration
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("dark-blue")
 
+# Library layout (unscaled pixels per row of cards)
+LIST_ROW_HEIGHT = 76
+GRID_ROW_HEIGHT = 210
+GRID_COLUMNS = 3
+
+# Music player playlist rows
+TRACK_ROW_HEIGHT = 36
+
+# Delay after the last keystroke before the library is searched
+SEARCH_DEBOUNCE_MS = 150
+
+# Held directions jump a page at a time after this many repeats
+PAGE_JUMP_REPEATS = 6
+
+# Key presses closer together than this are treated as keyboard auto-repeat
+KEY_REPEAT_WINDOW = 0.15
+
+# Rows kept in the warm-start snapshot, enough for a full screen in either view
+SNAPSHOT_ROWS = 60
+
+# How often a warm start checks whether the real library has loaded
+GAMES_POLL_MS = 50
+
+# A latency replay lays out a typical window, placed off-screen
+REPLAY_GEOMETRY = "1280x800+-4000+0"
+
+def format_play_time(settings_manager, session_log, game):
+    hours = game.get("play_time", 0) / 3600
+    time_text = f"{settings_manager.get_text('time_played')}: {hours:.1f}{settings_manager.get_text('hours')}"
+    week_hours = session_log.time_this_week(game["path"]) / 3600
+    if week_hours:
+        time_text += f"  ·  {settings_manager.get_text('this_week')}: {week_hours:.1f}{settings_manager.get_text('hours')}"
+    return time_text
+
 class EditGameDialog(ctk.CTkToplevel):
     def __init__(self, parent, game_data, settings_manager, save_callback):
         super().__init__(parent)
@@ -36,6 +83,7 @@ class EditGameDialog(ctk.CTkToplevel):
         self.name_entry = ctk.CTkEntry(self, placeholder_text="Name")
         self.name_entry.insert(0, game_data["name"])
         self.name_entry.pack(pady=10, padx=20, fill="x")
+        self.name_entry.bind("<KeyRelease>", self.on_name_changed, add="+")
         
         # Description
         ctk.CTkLabel(self, text=settings_manager.get_text("description")).pack(anchor="w", padx=20)
@@ -55,7 +103,10 @@ class EditGameDialog(ctk.CTkToplevel):
         self.args_entry.insert(0, game_data.get("launch_args", ""))
         self.args_entry.pack(pady=5, padx=20, fill="x")
         
-        # Fetch Button
+        # Fetch Button (the lookup runs on the metadata client's pool)
+        self.fetch_future = None
+        self.fetch_name = None
+        self.fetch_results = queue.Queue()
         self.fetch_btn = ctk.CTkButton(self, text=settings_manager.get_text("fetch_metadata"), command=self.fetch_data)
         self.fetch_btn.pack(pady=5)
         
@@ -71,16 +122,59 @@ class EditGameDialog(ctk.CTkToplevel):
         
     def update_icon_preview(self):
         if self.icon_path and os.path.exists(self.icon_path):
-            try:
-                pil_image = Image.open(self.icon_path)
-                img = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(60, 60))
+            img = icon_cache.get(self.icon_path, (60, 60))
+            if img:
                 self.icon_label.configure(image=img, text="")
-            except:
+            else:
                 self.icon_label.configure(text="Invalid Icon")
                 
     def fetch_data(self):
-        name = self.name_entry.get()
-        data = fetch_metadata(name)
+        self.cancel_fetch()
+        self.fetch_name = self.name_entry.get()
+        future = get_client().submit(self.fetch_name)
+        self.fetch_future = future
+        # Completion is handed back through a queue, the Tk thread picks it up in poll_fetch
+        future.add_done_callback(self.fetch_results.put)
+        self.fetch_btn.configure(text=self.settings_manager.get_text("fetching"), state="disabled")
+        self.after(50, self.poll_fetch)
+
+    def poll_fetch(self):
+        if not self.winfo_exists():
+            return
+        try:
+            future = self.fetch_results.get_nowait()
+        except queue.Empty:
+            if self.fetch_future is not None:
+                self.after(50, self.poll_fetch)
+            return
+        if future is not self.fetch_future:
+            # Result of a cancelled fetch, keep waiting for the current one
+            self.poll_fetch()
+            return
+        
+        self.fetch_future = None
+        self.fetch_btn.configure(text=self.settings_manager.get_text("fetch_metadata"), state="normal")
+        if future.cancelled():
+            return
+        try:
+            data = future.result()
+        except Exception as e:
+            print(f"Error fetching metadata: {e}")
+            return
+        self.apply_metadata(data)
+
+    def cancel_fetch(self):
+        if self.fetch_future is not None:
+            self.fetch_future.cancel()
+            self.fetch_future = None
+            self.fetch_btn.configure(text=self.settings_manager.get_text("fetch_metadata"), state="normal")
+
+    def on_name_changed(self, event=None):
+        # A running lookup is for the old name, its result would be wrong
+        if self.fetch_future is not None and self.name_entry.get() != self.fetch_name:
+            self.cancel_fetch()
+
+    def apply_metadata(self, data):
         if data:
             self.desc_textbox.delete("0.0", "end")
             self.desc_textbox.insert("0.0", data["description"])
@@ -90,6 +184,10 @@ class EditGameDialog(ctk.CTkToplevel):
                 new_cats = list(set(current_cats + data["genres"]))
                 self.cat_entry.delete(0, "end")
                 self.cat_entry.insert(0, ", ".join(new_cats))
+
+    def destroy(self):
+        self.cancel_fetch()
+        super().destroy()
             
     def save(self):
         new_name = self.name_entry.get()
@@ -100,39 +198,28 @@ class EditGameDialog(ctk.CTkToplevel):
         self.destroy()
 
 class GameCard(ctk.CTkFrame):
-    def __init__(self, master, game_data, launch_callback, settings_manager, favorite_callback, edit_callback, **kwargs):
+    def __init__(self, master, launch_callback, settings_manager, favorite_callback, edit_callback, sound_callback, session_log, **kwargs):
         super().__init__(master, **kwargs)
-        self.game_data = game_data
+        self.game_data = None
         self.launch_callback = launch_callback
         self.settings_manager = settings_manager
+        self.session_log = session_log
         self.favorite_callback = favorite_callback
         self.edit_callback = edit_callback
         
-        # Style
         # Style
         self.configure(fg_color=("gray85", "gray17"), corner_radius=10)
-        self.pack(pady=8, padx=15, fill="x", expand=True)
-        
-        # Icon
-        self.icon_image = None
-        if game_data["icon"] and os.path.exists(game_data["icon"]):
-            try:
-                pil_image = Image.open(game_data["icon"])
-                self.icon_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(40, 40))
-            except Exception as e:
-                print(f"Error loading icon: {e}")
         
         # Layout
         self.grid_columnconfigure(2, weight=1)
         
         # Icon Label
-        self.icon_label = ctk.CTkLabel(self, text="", image=self.icon_image)
+        self.icon_image = None
+        self.icon_label = ctk.CTkLabel(self, text="", width=40, height=40)
         self.icon_label.grid(row=0, column=0, padx=10, pady=10)
         
         # Favorite Button (Star)
-        fav_text = "★" if game_data.get("favorite") else "☆"
-        fav_color = "gold" if game_data.get("favorite") else "gray"
-        self.fav_btn = ctk.CTkButton(self, text=fav_text, width=30, fg_color="transparent", text_color=fav_color, font=("Arial", 20), command=self.toggle_fav)
+        self.fav_btn = ctk.CTkButton(self, text="☆", width=30, fg_color="transparent", text_color="gray", font=("Arial", 20), command=self.toggle_fav)
         self.fav_btn.grid(row=0, column=1, padx=0)
         
         # Info Frame
@@ -140,13 +227,11 @@ class GameCard(ctk.CTkFrame):
         self.info_frame.grid(row=0, column=2, padx=10, sticky="w")
         
         # Name Label
-        self.name_label = ctk.CTkLabel(self.info_frame, text=game_data["name"], font=("Roboto", 16, "bold"))
+        self.name_label = ctk.CTkLabel(self.info_frame, text="", font=("Roboto", 16, "bold"))
         self.name_label.pack(anchor="w")
         
         # Play Time Label
-        hours = game_data.get("play_time", 0) / 3600
-        time_text = f"{self.settings_manager.get_text('time_played')}: {hours:.1f}{self.settings_manager.get_text('hours')}"
-        self.time_label = ctk.CTkLabel(self.info_frame, text=time_text, font=("Roboto", 12), text_color="gray60")
+        self.time_label = ctk.CTkLabel(self.info_frame, text="", font=("Roboto", 12), text_color="gray60")
         self.time_label.pack(anchor="w")
         
         # Buttons Frame
@@ -162,14 +247,32 @@ class GameCard(ctk.CTkFrame):
         self.play_btn.pack(side="left")
 
         # Bind Sounds
-        self.fav_btn.bind("<Enter>", lambda e: master.master.master.sound_manager.play("hover"))
-        self.fav_btn.bind("<Button-1>", lambda e: master.master.master.sound_manager.play("click"), add="+")
+        self.fav_btn.bind("<Enter>", lambda e: sound_callback("hover"))
+        self.fav_btn.bind("<Button-1>", lambda e: sound_callback("click"), add="+")
         
-        self.edit_btn.bind("<Enter>", lambda e: master.master.master.sound_manager.play("hover"))
-        self.edit_btn.bind("<Button-1>", lambda e: master.master.master.sound_manager.play("click"), add="+")
+        self.edit_btn.bind("<Enter>", lambda e: sound_callback("hover"))
+        self.edit_btn.bind("<Button-1>", lambda e: sound_callback("click"), add="+")
         
-        self.play_btn.bind("<Enter>", lambda e: master.master.master.sound_manager.play("hover"))
-        self.play_btn.bind("<Button-1>", lambda e: master.master.master.sound_manager.play("launch"), add="+")
+        self.play_btn.bind("<Enter>", lambda e: sound_callback("hover"))
+        self.play_btn.bind("<Button-1>", lambda e: sound_callback("launch"), add="+")
+
+    def set_data(self, game_data):
+        # Rebind this (recycled) card to another game without rebuilding its widgets
+        previous = self.game_data
+        self.game_data = game_data
+        
+        if previous is None or previous.get("icon") != game_data.get("icon"):
+            self.icon_image = icon_cache.get(game_data.get("icon"), (40, 40))
+            self.icon_label.configure(image=self.icon_image or blank_image((40, 40)))
+        
+        fav_text = "★" if game_data.get("favorite") else "☆"
+        fav_color = "gold" if game_data.get("favorite") else "gray"
+        self.fav_btn.configure(text=fav_text, text_color=fav_color)
+        self.name_label.configure(text=game_data["name"])
+        self.update_text()
+
+    def set_focused(self, focused):
+        self.configure(border_width=2 if focused else 0, border_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"])
 
     def launch_game(self):
         self.launch_callback(self.game_data["path"])
@@ -182,41 +285,47 @@ class GameCard(ctk.CTkFrame):
     
     def update_text(self):
         self.play_btn.configure(text=self.settings_manager.get_text("play"))
-        hours = self.game_data.get("play_time", 0) / 3600
-        time_text = f"{self.settings_manager.get_text('time_played')}: {hours:.1f}{self.settings_manager.get_text('hours')}"
+        # Rows from the warm-start snapshot carry their label already
+        time_text = self.game_data.get("time_text") or format_play_time(self.settings_manager, self.session_log, self.game_data)
         self.time_label.configure(text=time_text)
 
 class GameGridCard(ctk.CTkFrame):
-    def __init__(self, master, game_data, launch_callback, **kwargs):
+    def __init__(self, master, launch_callback, **kwargs):
         super().__init__(master, **kwargs)
-        self.game_data = game_data
+        self.game_data = None
         self.launch_callback = launch_callback
         
         self.configure(fg_color=("gray85", "gray17"), corner_radius=15)
         
-        # Icon
         self.icon_image = None
-        if game_data["icon"] and os.path.exists(game_data["icon"]):
-            try:
-                pil_image = Image.open(game_data["icon"])
-                self.icon_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(100, 100))
-            except:
-                pass
-        
-        self.icon_label = ctk.CTkButton(self, text="", image=self.icon_image, fg_color="transparent", hover_color=("gray70", "gray30"), command=self.launch_game, width=120, height=120, corner_radius=15)
+        self.icon_label = ctk.CTkButton(self, text="", fg_color="transparent", hover_color=("gray70", "gray30"), command=self.launch_game, width=120, height=120, corner_radius=15)
         self.icon_label.pack(pady=(15, 0))
         
-        self.name_label = ctk.CTkLabel(self, text=game_data["name"], font=("Roboto", 14, "bold"), wraplength=120)
+        self.name_label = ctk.CTkLabel(self, text="", font=("Roboto", 14, "bold"), wraplength=120)
         self.name_label.pack(pady=(5, 10))
+
+    def set_data(self, game_data):
+        previous = self.game_data
+        self.game_data = game_data
+        
+        if previous is None or previous.get("icon") != game_data.get("icon"):
+            self.icon_image = icon_cache.get(game_data.get("icon"), (100, 100))
+            self.icon_label.configure(image=self.icon_image or blank_image((100, 100)))
         
+        self.name_label.configure(text=game_data["name"])
+        
+    def set_focused(self, focused):
+        self.configure(border_width=2 if focused else 0, border_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"])
+
     def launch_game(self):
         self.launch_callback(self.game_data["path"])
 
 class SettingsDialog(ctk.CTkToplevel):
-    def __init__(self, parent, settings_manager, refresh_callback):
+    def __init__(self, parent, settings_manager, refresh_callback, video_cache=None):
         super().__init__(parent)
         self.settings_manager = settings_manager
         self.refresh_callback = refresh_callback
+        self.video_cache = video_cache
         self.title(settings_manager.get_text("settings"))
         self.geometry("400x500")
         self.resizable(False, False)
@@ -261,10 +370,15 @@ class SettingsDialog(ctk.CTkToplevel):
         if file_path:
             self.settings_manager.set_setting("startup_video", file_path)
             self.video_label.configure(text=os.path.basename(file_path))
+            if self.video_cache:
+                # Transcode now so the next boot plays straight from the cache
+                self.video_cache.build_async(file_path, (self.winfo_screenwidth(), self.winfo_screenheight()))
 
     def remove_video(self):
         self.settings_manager.set_setting("startup_video", "")
         self.video_label.configure(text="None")
+        if self.video_cache:
+            self.video_cache.prune()
 
     def open_theme_editor(self):
         ThemeEditorDialog(self, self.settings_manager, self.apply_custom_theme)
@@ -291,13 +405,36 @@ class SettingsDialog(ctk.CTkToplevel):
         ctk.set_default_color_theme(theme_code)
         self.refresh_callback()
 
+class TrackRow(ctk.CTkButton):
+    # Playlist row, recycled by the VirtualList
+    def __init__(self, master, play_callback, **kwargs):
+        super().__init__(master, text="", anchor="w", fg_color="transparent", border_width=1,
+                         text_color=("gray10", "gray90"), height=32, command=self.play, **kwargs)
+        self.track = None
+        self.play_callback = play_callback
+        
+    def set_data(self, track):
+        self.track = track
+        text = track["title"]
+        if track["artist"]:
+            text = f"{track['artist']} - {text}"
+        if track["duration"]:
+            text = f"{text}  ({format_duration(track['duration'])})"
+        self.configure(text=text)
+        
+    def play(self):
+        if self.track:
+            self.play_callback(self.track["index"])
+
 class MusicDialog(ctk.CTkToplevel):
-    def __init__(self, parent, music_manager, settings_manager):
+    def __init__(self, parent, music_manager, music_library, settings_manager):
         super().__init__(parent)
         self.music_manager = music_manager
+        self.music_library = music_library
         self.settings_manager = settings_manager
+        self.scanners = []
         self.title(settings_manager.get_text("music_player"))
-        self.geometry("300x400")
+        self.geometry("360x460")
         
         # Controls
         self.controls_frame = ctk.CTkFrame(self)
@@ -309,27 +446,86 @@ class MusicDialog(ctk.CTkToplevel):
         self.next_btn = ctk.CTkButton(self.controls_frame, text="⏭", width=40, command=self.next_track)
         self.next_btn.pack(side="left", padx=10)
         
+        self.folder_btn = ctk.CTkButton(self.controls_frame, text="📁", width=40, command=self.add_folder)
+        self.folder_btn.pack(side="right", padx=10)
+        
         self.add_btn = ctk.CTkButton(self.controls_frame, text="+", width=40, command=self.add_music)
-        self.add_btn.pack(side="right", padx=10)
+        self.add_btn.pack(side="right")
+        
+        # Play order
+        self.mode_frame = ctk.CTkFrame(self)
+        self.mode_frame.pack(fill="x", padx=10)
+        
+        self.shuffle_switch = ctk.CTkSwitch(self.mode_frame, text=settings_manager.get_text("shuffle"), command=self.toggle_shuffle)
+        if music_manager.shuffle:
+            self.shuffle_switch.select()
+        self.shuffle_switch.pack(side="left", padx=10, pady=5)
+        
+        self.repeat_names = {mode: settings_manager.get_text(f"repeat_{mode}") for mode in ("off", "all", "one")}
+        self.repeat_option = ctk.CTkOptionMenu(self.mode_frame, values=list(self.repeat_names.values()), width=120, command=self.change_repeat)
+        self.repeat_option.set(self.repeat_names[music_manager.repeat])
+        self.repeat_option.pack(side="right", padx=10, pady=5)
+        
+        # Playlist (recycled rows, drawn from the library index)
+        self.playlist_view = VirtualList(
+            self,
+            lambda master: TrackRow(master, self.play_track),
+            TRACK_ROW_HEIGHT,
+            label_text="Playlist",
+            empty_text=settings_manager.get_text("no_music")
+        )
+        self.playlist_view.pack(fill="both", expand=True, padx=10, pady=(10, 0))
         
-        # Playlist
-        self.playlist_frame = ctk.CTkScrollableFrame(self, label_text="Playlist")
-        self.playlist_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.status_label = ctk.CTkLabel(self, text="", font=("Roboto", 12), text_color="gray60")
+        self.status_label.pack(pady=(0, 5))
         
         self.refresh_playlist()
+        # Pick up tags of tracks that are new or changed since they were last indexed
+        self.start_scan(self.music_manager.playlist, add=False)
         
     def refresh_playlist(self):
-        for widget in self.playlist_frame.winfo_children():
-            widget.destroy()
-            
-        playlist = self.music_manager.get_playlist()
-        if not playlist:
-            ctk.CTkLabel(self.playlist_frame, text=self.settings_manager.get_text("no_music")).pack(pady=20)
+        tracks = []
+        for i, path in enumerate(self.music_manager.playlist):
+            track = self.music_library.info(path)
+            track["index"] = i
+            tracks.append(track)
+        self.playlist_view.set_items(tracks)
+        
+    def start_scan(self, roots, add=True):
+        if not roots:
             return
+        scanner = MusicScanner(self.music_library)
+        scanner.start(roots)
+        self.scanners.append((scanner, add))
+        if len(self.scanners) == 1:
+            self.poll()
             
-        for i, track in enumerate(playlist):
-            btn = ctk.CTkButton(self.playlist_frame, text=track, command=lambda idx=i: self.play_track(idx), fg_color="transparent", border_width=1)
-            btn.pack(fill="x", pady=2)
+    def poll(self):
+        # Apply whatever the workers finished since the last tick, then redraw once
+        if not self.scanners:
+            return # Dialog closed
+        changed = False
+        for scanner, add in self.scanners:
+            found = []
+            for kind, data in scanner.poll():
+                if kind == "indexed":
+                    found.append(data[0])
+                    changed = True
+                elif kind == "cached":
+                    found.append(data)
+            if add and found and self.music_manager.add_tracks(found):
+                changed = True
+        if changed:
+            self.refresh_playlist()
+        
+        self.scanners = [(scanner, add) for scanner, add in self.scanners if not scanner.finished]
+        if self.scanners:
+            done = sum(scanner.done for scanner, add in self.scanners)
+            found = sum(scanner.found for scanner, add in self.scanners)
+            self.status_label.configure(text=f"{self.settings_manager.get_text('indexing')} {done}/{found}")
+            self.after(100, self.poll)
+        else:
+            self.status_label.configure(text="")
             
     def toggle_play(self):
         self.music_manager.pause()
@@ -340,14 +536,96 @@ class MusicDialog(ctk.CTkToplevel):
     def play_track(self, index):
         self.music_manager.play(index)
         
+    def toggle_shuffle(self):
+        shuffle = bool(self.shuffle_switch.get())
+        self.music_manager.set_shuffle(shuffle)
+        self.settings_manager.set_setting("music_shuffle", shuffle)
+        
+    def change_repeat(self, choice):
+        mode = next(mode for mode, name in self.repeat_names.items() if name == choice)
+        self.music_manager.set_repeat(mode)
+        self.settings_manager.set_setting("music_repeat", mode)
+        
     def add_music(self):
         file_path = filedialog.askopenfilename(filetypes=[("Audio Files", "*.mp3 *.wav *.ogg")])
         if file_path:
-            self.music_manager.add_music(file_path)
-            self.refresh_playlist()
+            self.start_scan([file_path])
+            
+    def add_folder(self):
+        folder = filedialog.askdirectory(title=self.settings_manager.get_text("music_player"))
+        if folder:
+            self.start_scan([folder])
+            
+    def destroy(self):
+        # Closed by the window manager or the controller's BACK
+        for scanner, add in self.scanners:
+            scanner.cancel()
+        self.scanners = []
+        super().destroy()
+
+class ImportDialog(ctk.CTkToplevel):
+    def __init__(self, parent, scanner, game_manager, settings_manager, on_games_added):
+        super().__init__(parent)
+        self.scanner = scanner
+        self.game_manager = game_manager
+        self.settings_manager = settings_manager
+        self.on_games_added = on_games_added
+        self.added = 0
+        self.title(settings_manager.get_text("scan_folder"))
+        self.geometry("400x180")
+        self.resizable(False, False)
+        
+        self.status_label = ctk.CTkLabel(self, text=settings_manager.get_text("importing"))
+        self.status_label.pack(pady=(20, 5))
+        
+        self.progress = ctk.CTkProgressBar(self)
+        self.progress.set(0)
+        self.progress.pack(pady=10, padx=20, fill="x")
+        
+        self.cancel_btn = ctk.CTkButton(self, text=settings_manager.get_text("cancel"), command=self.cancel)
+        self.cancel_btn.pack(pady=10)
+        
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.poll()
+        
+    def poll(self):
+        # Insert whatever the workers finished since the last tick, then redraw once
+        if not self.winfo_exists():
+            return
+        added_now = 0
+        for kind, data in self.scanner.poll():
+            if kind == "prepared":
+                success, message = self.game_manager.insert_game(data)
+                if success:
+                    added_now += 1
+            elif kind == "failed":
+                print(f"Could not import {data[0]}: {data[1]}")
+        
+        if added_now:
+            self.added += added_now
+            self.on_games_added()
+        
+        found, done = self.scanner.found, self.scanner.done
+        if found:
+            self.progress.set(done / found)
+        self.status_label.configure(text=f"{self.settings_manager.get_text('importing')} {done}/{found} ({self.added} {self.settings_manager.get_text('games_added')})")
+        
+        if self.scanner.finished:
+            self.progress.set(1)
+            self.cancel_btn.configure(text=self.settings_manager.get_text("close"), command=self.destroy)
+        else:
+            self.after(100, self.poll)
+            
+    def cancel(self):
+        self.destroy()
+        
+    def destroy(self):
+        # Closed by the window manager, Cancel or the controller's BACK
+        self.scanner.cancel()
+        super().destroy()
 
 class GameLauncherApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, controller_source=None, replay=False):
         super().__init__()
         
         # Fix Taskbar Icon
@@ -358,15 +636,81 @@ class GameLauncherApp(ctk.CTk):
         except:
             pass
 
-        self.game_manager = GameManager()
-        self.settings_manager = SettingsManager()
-        self.music_manager = MusicManager()
-        self.sound_manager = SoundManager()
-        
-        self.chat_client = ChatClient(on_message=self.on_chat_message)
+        # Subsystems start in stages: what the first screen needs runs right away,
+        # audio, controller and tray once it is painted, chat the first time it is opened
+        self.sound_manager = None
+        self.controller = None
+        self.tray_icon = None
+        self.chat_client = None
         self.friends_panel = None
         self.username = None
-        
+        self.settings_window = None
+        self.music_window = None
+        self.music_library = None # Loaded when the music dialog first opens
+        self.video_player = None
+        self.last_nav_key = (None, 0, 0)
+        self.input_latency = None # Set by input_latency.py to time controller input
+        self.games_waiting = [] # (callback, args) to run once the games stage is done
+        self.controller_source = controller_source # Replaces the joystick, e.g. input_latency.py's replay
+        # Set by input_latency.py: no video, tray or audio, and nothing is saved on exit
+        self.replay = replay
+        
+        self.boot = BootScheduler(self)
+        self.boot.add("data", self.boot_data)
+        self.boot.add("games", self.boot_games, deps=["data"], mode="background")
+        self.boot.add("window", self.boot_window, deps=["data"])
+        self.boot.add("library", self.boot_library, deps=["window"])
+        self.boot.add("audio", self.boot_audio, deps=["data"], mode="background")
+        # pygame.init() must not race the mixer init of the audio stage
+        self.boot.add("controller", self.boot_controller, deps=["audio"], mode="background")
+        self.boot.add("tray", self.boot_tray, deps=["window"], mode="background")
+        self.boot.add("loudness", self.boot_loudness, deps=["data"], mode="background")
+        self.boot.add("chat", self.boot_chat, mode="on_demand")
+
+        # Set by startup_benchmark.py: report once the first frame is drawn, then quit.
+        # The modules are listed before the background stages start importing theirs.
+        probe_file = os.environ.get("GAMELAUNCHER_STARTUP_PROBE")
+        if probe_file:
+            self.boot.on_first_paint(lambda: self.report_startup(probe_file))
+        self.boot.start()
+        if self.warm_start:
+            # The snapshot rows stay up until the games stage is done, the Tk thread never waits for it
+            self.after(GAMES_POLL_MS, self.poll_games_stage)
+
+    def boot_data(self):
+        # Saves are coalesced and written atomically off the Tk thread
+        self.persister = WriteBehindPersister()
+        
+        self.settings_manager = SettingsManager(persister=self.persister)
+        
+        # The library is loaded in the background; until then the first screen comes from
+        # the snapshot saved on exit, if the games haven't changed since
+        self.game_storage = open_storage("games.json")
+        self.snapshot = LibrarySnapshot()
+        self.warm_start = self.snapshot.load(self.game_storage.mtime(), self.settings_manager.get_setting("language"))
+        # Music plays on its own engine thread, crossfade 0 switches tracks gaplessly instead
+        # Tracks are turned down to a common loudness once they have been analyzed
+        self.loudness = LoudnessAnalyzer(persister=self.persister,
+                                         target=self.settings_manager.get_setting("music_target_lufs", -18.0))
+        self.music_manager = MusicManager(persister=self.persister,
+                                          crossfade=self.settings_manager.get_setting("music_crossfade", 2.0),
+                                          loudness=self.loudness)
+        self.music_manager.set_shuffle(self.settings_manager.get_setting("music_shuffle", False))
+        self.music_manager.set_repeat(self.settings_manager.get_setting("music_repeat", "all"))
+        
+        # Decoded icons are shared by every card and dialog, bounded by this budget
+        icon_cache.set_budget(self.settings_manager.get_setting("icon_cache_mb", 64) * 1024 * 1024)
+        
+        # Startup video pre-scaled to the screen and compressed, decoded live if it still exceeds this budget
+        self.video_cache = VideoCache(budget_bytes=self.settings_manager.get_setting("video_cache_mb", 1024) * 1024 * 1024)
+        
+        # Play history, aggregates are kept up to date as sessions end
+        self.session_log = SessionLog(persister=self.persister)
+        
+        # Running games, play time is recorded when they exit
+        self.supervisor = GameSupervisor(self.on_game_exit)
+
+    def boot_window(self):
         # Apply saved theme
         saved_theme = self.settings_manager.get_setting("theme", "dark-blue")
         if saved_theme == "custom":
@@ -389,22 +733,16 @@ class GameLauncherApp(ctk.CTk):
         
         # Check for startup video
         startup_video = self.settings_manager.get_setting("startup_video", "")
-        if startup_video and os.path.exists(startup_video):
+        if self.replay:
+            # Withdrawn or minimized, the list would have no viewport to lay out and redraw
+            self.geometry(REPLAY_GEOMETRY)
+        elif startup_video and os.path.exists(startup_video):
             self.play_startup_video(startup_video)
         else:
             self.after(0, lambda: self.state('zoomed')) # Maximize on startup
         
-        self.settings_window = None
-        self.music_window = None
-        
-        # System Tray
-        self.tray_icon = TrayIcon(icon_path if os.path.exists(icon_path) else "icon.ico", self.restore_from_tray, self.quit_app)
-        self.tray_icon.start()
         self.protocol("WM_DELETE_WINDOW", self.minimize_to_tray)
         
-        # Controller
-        self.controller = ControllerManager(self.handle_controller_input)
-        
         self.view_mode = "list" # or "grid"
         self.current_category = "All"
 
@@ -421,6 +759,7 @@ class GameLauncherApp(ctk.CTk):
         self.title_label.pack(side="left", padx=20, pady=15)
         
         # Search Bar
+        self.search_after_id = None
         self.search_var = ctk.StringVar()
         self.search_var.trace("w", self.filter_games)
         self.search_entry = ctk.CTkEntry(self.header_frame, placeholder_text=self.settings_manager.get_text("search_placeholder"), textvariable=self.search_var, width=150)
@@ -445,6 +784,10 @@ class GameLauncherApp(ctk.CTk):
         self.add_btn = ctk.CTkButton(self.header_frame, text=self.settings_manager.get_text("add_game"), command=self.add_game_dialog, width=100)
         self.add_btn.pack(side="right", padx=5, pady=15)
 
+        # Scan Folder Button
+        self.scan_btn = self.create_header_button("folder.png", "📁", self.scan_folder_dialog)
+        self.scan_btn.pack(side="right", padx=5, pady=15)
+
         # View Toggle
         self.view_btn = self.create_header_button("grid.png", "▦", self.toggle_view)
         self.view_btn.pack(side="right", padx=5, pady=15)
@@ -454,32 +797,145 @@ class GameLauncherApp(ctk.CTk):
         self.category_frame.grid(row=1, column=0, sticky="ew")
         self.category_frame.grid_columnconfigure(0, weight=1) # Center content
         
-        self.categories = ["All"] + self.game_manager.get_categories()
+        if self.warm_start:
+            self.categories = self.warm_start["categories"]
+        else:
+            self.categories = ["All"] + self.game_manager.get_categories()
         self.category_seg = ctk.CTkSegmentedButton(self.category_frame, values=self.categories, command=self.change_category)
         self.category_seg.set("All")
         self.category_seg.pack(pady=5)
-        
-        # Game List
-        self.scrollable_frame = ctk.CTkScrollableFrame(self, label_text=self.settings_manager.get_text("library"))
+
+    def boot_library(self):
+        # Game List (recycled cards, only the visible ones exist)
+        self.scrollable_frame = VirtualList(
+            self,
+            self.create_list_card,
+            LIST_ROW_HEIGHT,
+            label_text=self.settings_manager.get_text("library"),
+            empty_text=self.settings_manager.get_text("no_games")
+        )
         self.scrollable_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
-        self.scrollable_frame.grid_columnconfigure(0, weight=1)
         
-        self.game_cards = []
-        self.load_game_list()
+        # Keyboard navigation, same commands as the controller
+        for key, command in (("<Up>", "UP"), ("<Down>", "DOWN"), ("<Left>", "LEFT"), ("<Right>", "RIGHT"),
+                             ("<Return>", "SELECT"), ("<Escape>", "BACK")):
+            self.bind(key, lambda event, command=command: self.on_nav_key(event, command))
+        
+        self.displayed_games = []
+        if self.warm_start:
+            self.displayed_games = self.warm_start["rows"]
+            self.scrollable_frame.set_items(self.displayed_games)
+        else:
+            self.load_game_list()
+
+    def boot_games(self):
+        # Runs on a boot thread: no Tk calls here, poll_games_stage picks the result up
+        self._game_manager = GameManager(storage=self.game_storage, persister=self.persister)
+
+    @property
+    def game_manager(self):
+        # Loaded by a background stage. Other threads wait for it; the Tk thread only gets here
+        # once it is done (see defer_until_games), or before the first paint when there is no snapshot
+        self.boot.require("games")
+        return self._game_manager
+
+    def poll_games_stage(self):
+        state = self.boot.state("games")
+        if state == "done":
+            self.reconcile_library()
+        elif state == "failed":
+            self.games_waiting = []
+        else:
+            self.after(GAMES_POLL_MS, self.poll_games_stage)
+
+    def defer_until_games(self, callback, *args):
+        """True if the games stage is still loading, callback(*args) then runs once it has."""
+        if self.boot.is_ready("games"):
+            return False
+        self.games_waiting.append((callback, args))
+        return True
+
+    def reconcile_library(self):
+        # Replace the snapshot rows with the real library, then run what was clicked meanwhile
+        self.warm_start = None
+        self.on_games_imported()
+        waiting, self.games_waiting = self.games_waiting, []
+        for callback, args in waiting:
+            callback(*args)
+
+    def save_snapshot(self):
+        if not self.boot.is_ready("games"):
+            return
+        # Close first: closing the database can checkpoint it and change its mtime
+        self.game_storage.close()
+        rows = []
+        for game in self._game_manager.get_games()[:SNAPSHOT_ROWS]:
+            rows.append({
+                "path": game["path"],
+                "name": game["name"],
+                "icon": game.get("icon"),
+                "favorite": game.get("favorite", False),
+                "time_text": format_play_time(self.settings_manager, self.session_log, game)
+            })
+        try:
+            self.snapshot.save(self.game_storage.mtime(), self.settings_manager.get_setting("language"),
+                               ["All"] + self._game_manager.get_categories(), rows)
+        except OSError as e:
+            print(f"Error saving library snapshot: {e}")
+
+    def boot_audio(self):
+        if self.replay:
+            return
+        # pygame and the mixer are only loaded here and in the controller stage
+        from sound_manager import SoundManager
+        self.sound_manager = SoundManager()
+
+    def boot_controller(self):
+        from controller_manager import ControllerManager
+        self.controller = ControllerManager(
+            self.handle_controller_input,
+            repeat_delay=self.settings_manager.get_setting("controller_repeat_delay", 0.4),
+            repeat_rate=self.settings_manager.get_setting("controller_repeat_rate", 12),
+            source=self.controller_source,
+            root=self,
+            # Only real input is recorded, never a replay
+            record_file=None if self.controller_source else os.environ.get("GAMELAUNCHER_RECORD_INPUT")
+        )
+
+    def boot_tray(self):
+        if self.replay:
+            return
+        icon_path = os.path.join("icons", "app_icon.ico")
+        self.tray_icon = TrayIcon(icon_path if os.path.exists(icon_path) else "icon.ico", self.restore_from_tray, self.quit_app)
+        self.tray_icon.start()
+
+    def boot_loudness(self):
+        if self.replay:
+            return
+        # Measures whatever isn't cached yet (new tracks, or a run cut short last time)
+        self.loudness.analyze(self.music_manager.playlist)
+
+    def boot_chat(self):
+        self.chat_client = ChatClient(on_message=self.on_chat_message)
+
+    def play_sound(self, name):
+        # Cards and buttons exist before the audio stage has finished
+        if self.sound_manager:
+            self.sound_manager.play(name)
+
+    def report_startup(self, probe_file):
+        self.update_idletasks()
+        with open(probe_file, "w") as f:
+            json.dump({"first_paint": time.time(), "modules": sorted(sys.modules)}, f)
+        self.after(0, self.quit_app)
 
     def bind_sounds(self, widget):
-        widget.bind("<Enter>", lambda e: self.sound_manager.play("hover"))
-        widget.bind("<Button-1>", lambda e: self.sound_manager.play("click"), add="+")
+        widget.bind("<Enter>", lambda e: self.play_sound("hover"))
+        widget.bind("<Button-1>", lambda e: self.play_sound("click"), add="+")
 
     def create_header_button(self, icon_name, fallback_text, command):
         icon_path = os.path.join("icons", icon_name)
-        image = None
-        if os.path.exists(icon_path):
-             try:
-                pil_image = Image.open(icon_path)
-                image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(20, 20))
-             except:
-                 pass
+        image = icon_cache.get(icon_path, (20, 20))
         
         btn = ctk.CTkButton(
             self.header_frame, 
@@ -493,62 +949,46 @@ class GameLauncherApp(ctk.CTk):
         self.bind_sounds(btn)
         return btn
 
-    def load_game_list(self, query=""):
-        # Clear existing
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        self.game_cards = []
-            
-        games = self.game_manager.get_games()
-        
-        # Filter by Category
-        if self.current_category != "All":
-            games = [g for g in games if self.current_category in g.get("categories", [])]
+    def create_list_card(self, parent):
+        return GameCard(
+            parent,
+            self.launch_game,
+            self.settings_manager,
+            self.toggle_favorite,
+            self.open_edit_dialog,
+            self.play_sound,
+            self.session_log
+        )
 
-        # Filter by Search
-        if query:
-            games = [g for g in games if query.lower() in g["name"].lower()]
-        
-        if not games:
-            self.empty_label = ctk.CTkLabel(self.scrollable_frame, text=self.settings_manager.get_text("no_games"), text_color="gray50")
-            self.empty_label.pack(pady=50)
-            return
+    def create_grid_card(self, parent):
+        return GameGridCard(parent, self.launch_game)
 
-        if self.view_mode == "list":
-            for game in games:
-                card = GameCard(
-                    self.scrollable_frame, 
-                    game, 
-                    self.launch_game, 
-                    self.settings_manager,
-                    self.toggle_favorite,
-                    self.open_edit_dialog
-                )
-                card.pack(pady=5, padx=5, fill="x")
-                self.game_cards.append(card)
+    def load_game_list(self, query="", keep_scroll=True):
+        # Category and search filters both come from GameManager's indexes
+        category = None if self.current_category == "All" else self.current_category
+        if not self.boot.is_ready("games"):
+            # Still showing the snapshot, reconcile_library reloads with the current filters
+            return
+        if query:
+            games = self.game_manager.search(query, category)
         else:
-            self.load_game_grid(games)
-
-    def load_game_grid(self, games):
-        self.scrollable_frame.grid_columnconfigure((0, 1, 2), weight=1)
-        row = 0
-        col = 0
-        for game in games:
-            card = GameGridCard(self.scrollable_frame, game, self.launch_game)
-            card.grid(row=row, column=col, padx=10, pady=10)
-            self.game_cards.append(card)
-            col += 1
-            if col > 2: # 3 columns
-                col = 0
-                row += 1
+            games = self.game_manager.get_games(category)
+        
+        # Visible cards are rebound in place, the rest of the library costs nothing
+        self.displayed_games = games
+        self.scrollable_frame.set_items(games, keep_scroll=keep_scroll)
 
     def toggle_view(self):
         self.view_mode = "grid" if self.view_mode == "list" else "list"
+        if self.view_mode == "list":
+            self.scrollable_frame.set_layout(self.create_list_card, LIST_ROW_HEIGHT)
+        else:
+            self.scrollable_frame.set_layout(self.create_grid_card, GRID_ROW_HEIGHT, columns=GRID_COLUMNS)
         self.load_game_list(self.search_var.get())
 
     def change_category(self, value):
         self.current_category = value
-        self.load_game_list(self.search_var.get())
+        self.load_game_list(self.search_var.get(), keep_scroll=False)
 
     def minimize_to_tray(self):
         self.withdraw()
@@ -557,23 +997,128 @@ class GameLauncherApp(ctk.CTk):
         self.after(0, self.deiconify)
         
     def quit_app(self):
-        self.tray_icon.stop()
-        self.controller.stop()
+        if self.tray_icon:
+            self.tray_icon.stop()
+        if self.controller:
+            self.controller.stop()
+        self.music_manager.close()
+        self.loudness.stop()
+        if self.replay:
+            # The library, its snapshot and the storage files are left as the replay found them
+            self.quit()
+            return
+        # Games still running keep going, count their time up to now
+        for path, started, ended in self.supervisor.stop():
+            self.record_session(path, started, ended, None)
+        self.persister.stop()
+        self.session_log.close()
+        self.save_snapshot()
         self.quit()
 
-    def handle_controller_input(self, command):
-        # Simple navigation logic
-        print(f"Controller: {command}")
-        if command == "SELECT":
-            # Launch first visible game or focused one (simplified)
-            if self.game_cards:
-                self.game_cards[0].launch_game()
-        # More complex navigation would require tracking focus state
+    def launch_game(self, path):
+        if self.defer_until_games(self.launch_game, path):
+            return
+        game = self.game_manager.get_game(path)
+        if game is None or not os.path.exists(path):
+            messagebox.showerror(self.settings_manager.get_text("error_launch"), self.settings_manager.get_text("game_not_found"))
+            return
+        try:
+            self.supervisor.launch(path, game.get("launch_args", ""))
+        except (OSError, ValueError) as e:
+            messagebox.showerror(self.settings_manager.get_text("error_launch"), str(e))
+            return
+        self.update_chat_status()
+
+    def on_game_exit(self, path, started, ended, exit_code):
+        # Called from the supervisor's watcher thread
+        self.after(0, lambda: self.record_session(path, started, ended, exit_code))
+
+    def record_session(self, path, started, ended, exit_code):
+        if self.defer_until_games(self.record_session, path, started, ended, exit_code):
+            return
+        self.session_log.record(path, started, ended, exit_code)
+        self.game_manager.update_play_time(path, ended - started)
+        # Only the visible cards need their play time label updated
+        self.scrollable_frame.refresh()
+        self.update_chat_status()
+
+    def update_chat_status(self):
+        if not self.chat_client or not self.boot.is_ready("games"):
+            return
+        running = self.supervisor.running_games()
+        game = self.game_manager.get_game(running[-1]) if running else None
+        self.chat_client.update_status(game["name"] if game else None)
+
+    def handle_controller_input(self, command, repeats=0, stamp=None):
+        # Called on the controller thread, Tk is only touched from the main loop
+        self.after(0, self.on_controller_input, command, repeats, stamp)
+
+    def on_controller_input(self, command, repeats, stamp):
+        latency = self.input_latency
+        if latency and stamp is not None:
+            latency.handled(stamp)
+        self.navigate(command, repeats)
+        if latency and stamp is not None:
+            # Idle callbacks queued by navigate (geometry, redraws) run before this one
+            self.after_idle(latency.redrawn, stamp)
+
+    def on_nav_key(self, event, command):
+        # Left/Right keep moving the cursor while typing in the search bar, the other keys still navigate
+        if isinstance(event.widget, tkinter.Entry) and command in ("LEFT", "RIGHT"):
+            return
+        last_command, last_time, last_repeats = self.last_nav_key
+        now = time.monotonic()
+        repeats = last_repeats + 1 if command == last_command and now - last_time < KEY_REPEAT_WINDOW else 0
+        self.last_nav_key = (command, now, repeats)
+        self.navigate(command, repeats)
+        return "break"
+
+    def top_dialog(self):
+        grab = self.grab_current()
+        if grab is not None and grab.winfo_toplevel() is not self:
+            return grab.winfo_toplevel()
+        dialogs = [w for w in self.winfo_children() if isinstance(w, ctk.CTkToplevel) and w.winfo_viewable()]
+        return dialogs[-1] if dialogs else None
+
+    def navigate(self, command, repeats=0):
+        if self.video_player:
+            # Any button skips the startup video
+            if repeats == 0:
+                self.video_player.stop()
+            return
+
+        dialog = self.top_dialog()
+        if dialog is not None:
+            # Dialogs handle their own widgets, BACK closes the topmost one
+            if command == "BACK" and repeats == 0:
+                self.play_sound("back")
+                dialog.destroy()
+            return
+
+        if command in ("UP", "DOWN", "LEFT", "RIGHT"):
+            self.scrollable_frame.move_focus(command, page=repeats >= PAGE_JUMP_REPEATS)
+            self.play_sound("hover")
+        elif command == "SELECT" and repeats == 0:
+            game = self.scrollable_frame.focused_item()
+            if game is None:
+                self.scrollable_frame.set_focus(0)
+                return
+            self.play_sound("launch")
+            self.launch_game(game["path"])
+        elif command == "BACK" and repeats == 0:
+            if self.search_var.get():
+                self.play_sound("back")
+                self.search_var.set("")
 
-            
     def filter_games(self, *args):
-        query = self.search_var.get()
-        self.load_game_list(query)
+        # Debounce: only the last keystroke of a burst triggers a search and redraw
+        if self.search_after_id:
+            self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self.search_after_id = None
+        self.load_game_list(self.search_var.get(), keep_scroll=False)
 
     def add_game_dialog(self):
         file_path = filedialog.askopenfilename(
@@ -582,18 +1127,48 @@ class GameLauncherApp(ctk.CTk):
         )
         
         if file_path:
-            success, message = self.game_manager.add_game(file_path)
-            if success:
-                self.load_game_list(self.search_var.get())
-            else:
-                print(message)
+            self.import_file(file_path)
+
+    def import_file(self, file_path):
+        if self.defer_until_games(self.import_file, file_path):
+            return
+        if self.game_manager.get_game(file_path) is not None:
+            print(self.settings_manager.get_text("game_exists"))
+            return
+        # Icon extraction and metadata lookup run on the scanner's workers
+        self.start_import([file_path])
+
+    def scan_folder_dialog(self):
+        folder = filedialog.askdirectory(title=self.settings_manager.get_text("scan_folder"))
+        if folder:
+            self.start_import([folder])
+
+    def start_import(self, roots):
+        if self.defer_until_games(self.start_import, roots):
+            return
+        scanner = LibraryScanner(self.game_manager)
+        scanner.start(roots)
+        ImportDialog(self, scanner, self.game_manager, self.settings_manager, self.on_games_imported)
+
+    def on_games_imported(self):
+        self.load_game_list(self.search_var.get())
+        self.categories = ["All"] + self.game_manager.get_categories()
+        self.category_seg.configure(values=self.categories)
 
     def toggle_favorite(self, path):
+        if self.defer_until_games(self.toggle_favorite, path):
+            return
         self.game_manager.toggle_favorite(path)
         self.load_game_list(self.search_var.get())
 
     def open_edit_dialog(self, game_data):
-        dialog = EditGameDialog(self, game_data, self.settings_manager, self.save_game_metadata)
+        # Cards may still show warm-start snapshot rows, which only carry what the card draws
+        if self.defer_until_games(self.open_edit_dialog, game_data):
+            return
+        game = self.game_manager.get_game(game_data["path"])
+        if game is None:
+            return
+        dialog = EditGameDialog(self, game, self.settings_manager, self.save_game_metadata)
         dialog.grab_set() # Modal
         dialog.focus_force()
         
@@ -607,7 +1182,7 @@ class GameLauncherApp(ctk.CTk):
 
     def open_settings(self):
         if self.settings_window is None or not self.settings_window.winfo_exists():
-            self.settings_window = SettingsDialog(self, self.settings_manager, self.refresh_ui)
+            self.settings_window = SettingsDialog(self, self.settings_manager, self.refresh_ui, self.video_cache)
             self.settings_window.grab_set()
             self.settings_window.focus_force()
         else:
@@ -616,7 +1191,9 @@ class GameLauncherApp(ctk.CTk):
             
     def open_music(self):
         if self.music_window is None or not self.music_window.winfo_exists():
-            self.music_window = MusicDialog(self, self.music_manager, self.settings_manager)
+            if self.music_library is None:
+                self.music_library = MusicLibrary(persister=self.persister)
+            self.music_window = MusicDialog(self, self.music_manager, self.music_library, self.settings_manager)
             self.music_window.grab_set()
             self.music_window.focus_force()
         else:
@@ -624,6 +1201,8 @@ class GameLauncherApp(ctk.CTk):
             self.music_window.lift()
             
     def spin_wheel(self):
+        if self.defer_until_games(self.spin_wheel):
+            return
         games = self.game_manager.get_games()
         if not games:
             return
@@ -649,51 +1228,46 @@ class GameLauncherApp(ctk.CTk):
         animate()
 
     def play_startup_video(self, video_path):
+        # OpenCV is only loaded when there is a video to play
+        from startup_video import StartupVideoPlayer, Cv2FrameSource
+        
         self.withdraw() # Hide main window
         
         video_window = ctk.CTkToplevel(self)
         video_window.title("Startup")
         video_window.attributes("-fullscreen", True)
         video_window.attributes("-topmost", True)
+        video_window.configure(fg_color="black")
         
-        # Label to hold video frame
-        label = ctk.CTkLabel(video_window, text="")
-        label.pack(fill="both", expand=True)
+        # Frames are shown at the screen resolution, the player never rescales
+        size = (video_window.winfo_screenwidth(), video_window.winfo_screenheight())
         
-        cap = cv2.VideoCapture(video_path)
+        # Later boots stream pre-scaled frames from the cache instead of decoding
+        source = self.video_cache.open(video_path, size)
+        cached = source is not None
+        if not cached:
+            source = Cv2FrameSource(video_path, size)
         
-        def stream():
-            ret, frame = cap.read()
-            if ret:
-                # Resize to fit screen (optional, but good for performance)
-                screen_width = video_window.winfo_screenwidth()
-                screen_height = video_window.winfo_screenheight()
-                frame = cv2.resize(frame, (screen_width, screen_height))
-                
-                # Convert color
-                cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
-                img = Image.fromarray(cv2image)
-                ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(screen_width, screen_height))
-                
-                label.configure(image=ctk_img)
-                label.image = ctk_img # Keep reference
-                
-                video_window.after(33, stream) # ~30 FPS
-            else:
-                finish()
-                
-        def finish(event=None):
-            cap.release()
+        def finish():
+            self.video_player = None
             video_window.destroy()
             self.deiconify()
             self.state('zoomed')
+            if not cached:
+                # Transcode once playback is over so it doesn't compete for CPU
+                self.video_cache.build_async(video_path, size)
             
-        video_window.bind("<Button-1>", finish) # Click to skip
-        video_window.bind("<Escape>", finish)
+        player = StartupVideoPlayer(video_window, source, finish)
+        self.video_player = player
+        video_window.bind("<Button-1>", lambda event: player.stop()) # Click to skip
+        video_window.bind("<Escape>", lambda event: player.stop())
+        video_window.focus_force()
         
-        stream()
+        player.start()
 
     def toggle_chat(self):
+        if not self.boot.require("chat"):
+            return
         if not self.username:
             # Ask for username
             user_dialog = ctk.CTkInputDialog(text="Enter Username:", title="Chat Login")
@@ -761,16 +1335,17 @@ class GameLauncherApp(ctk.CTk):
         self.title(self.settings_manager.get_text("window_title"))
         self.title_label.configure(text=self.settings_manager.get_text("my_games"))
         self.add_btn.configure(text=self.settings_manager.get_text("add_game"))
-        self.scrollable_frame.configure(label_text=self.settings_manager.get_text("library"))
+        self.scrollable_frame.configure(
+            label_text=self.settings_manager.get_text("library"),
+            empty_text=self.settings_manager.get_text("no_games")
+        )
         self.search_entry.configure(placeholder_text=self.settings_manager.get_text("search_placeholder"))
-        
-        # Update empty label if exists
-        if hasattr(self, 'empty_label') and self.empty_label.winfo_exists():
-             self.empty_label.configure(text=self.settings_manager.get_text("no_games"))
 
-        # Reload list to update cards
-        self.load_game_list(self.search_var.get())
+        # Recreate the visible cards so they pick up the new texts and theme colors
+        self.scrollable_frame.rebuild()
 
 if __name__ == "__main__":
+    # Loudness analysis runs in worker processes, which a frozen build has to support
+    multiprocessing.freeze_support()
     app = GameLauncherApp()
     app.mainloop()
@@ -0,0 +1,111 @@
+import threading
+import time
+
+class BootStage:
+    def __init__(self, name, run, deps, mode):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.mode = mode
+        self.state = "pending" # pending, running, done, failed
+        self.error = None
+        self.duration = None
+        self.done = threading.Event()
+
+class BootScheduler:
+    """
+    Starts the app's subsystems in stages with declared dependencies.
+    "ui" stages run on the Tk thread before the first paint, "background" stages
+    on their own threads once the first frame is drawn, and "on_demand" stages
+    the first time something calls require(name).
+    """
+    def __init__(self, root):
+        self.root = root
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.first_paint_callbacks = []
+
+    def add(self, name, run, deps=(), mode="ui"):
+        if mode not in ("ui", "background", "on_demand"):
+            raise ValueError(f"Unknown boot mode {mode}")
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Boot stage {name} depends on unknown stage {dep}")
+            if mode == "ui" and self.stages[dep].mode != "ui":
+                raise ValueError(f"UI stage {name} can't wait for {self.stages[dep].mode} stage {dep}")
+        self.stages[name] = BootStage(name, run, deps, mode)
+
+    def on_first_paint(self, callback):
+        """Calls callback on the Tk thread once the first frame is drawn, before any background stage starts."""
+        self.first_paint_callbacks.append(callback)
+
+    def start(self):
+        # Stages can only depend on stages added before them, so insertion order is a valid order
+        for stage in self.stages.values():
+            if stage.mode == "ui":
+                self._run(stage)
+        self.root.after(0, lambda: self.root.after_idle(self._start_background))
+
+    def _start_background(self):
+        for callback in self.first_paint_callbacks:
+            callback()
+        for stage in self.stages.values():
+            if stage.mode == "background":
+                threading.Thread(target=self._run, args=(stage,), name=f"boot-{stage.name}", daemon=True).start()
+
+    def _run(self, stage):
+        with self.lock:
+            if stage.state != "pending":
+                run = False
+            else:
+                stage.state = "running"
+                run = True
+        if not run:
+            stage.done.wait()
+            return stage.state == "done"
+
+        for dep in stage.deps:
+            dep_stage = self.stages[dep]
+            if dep_stage.mode == "on_demand" or dep_stage.state != "pending":
+                ok = self._run(dep_stage)
+            else:
+                # A background dependency is started by its own thread, wait for it
+                dep_stage.done.wait()
+                ok = dep_stage.state == "done"
+            if not ok:
+                stage.state = "failed"
+                stage.error = f"dependency {dep} failed"
+                print(f"Boot stage {stage.name} skipped: {stage.error}")
+                stage.done.set()
+                return False
+
+        start = time.perf_counter()
+        try:
+            stage.run()
+            stage.state = "done"
+        except Exception as e:
+            stage.state = "failed"
+            stage.error = e
+            print(f"Boot stage {stage.name} failed: {e}")
+        stage.duration = time.perf_counter() - start
+        print(f"Boot stage {stage.name} ({stage.mode}): {stage.duration * 1000:.1f}ms")
+        stage.done.set()
+        if stage.state == "failed" and stage.mode == "ui":
+            # Without its UI stages there is no usable window
+            raise stage.error
+        return stage.state == "done"
+
+    def require(self, name):
+        """Makes sure a stage has run, running on-demand stages on the calling thread. Returns True if it succeeded."""
+        return self._run(self.stages[name])
+
+    def is_ready(self, name):
+        return self.stages[name].state == "done"
+
+    def state(self, name):
+        """pending, running, done or failed"""
+        return self.stages[name].state
+
+    def timings(self):
+        """{stage name: (mode, state, seconds or None)}"""
+        return {stage.name: (stage.mode, stage.state, stage.duration) for stage in self.stages.values()}
@@ -1,4 +1,3 @@
-import paho.mqtt.client as mqtt
 import json
 import threading
 import time
@@ -7,9 +6,7 @@ class ChatClient:
     def __init__(self, broker='broker.hivemq.com', port=1883, on_message=None):
         self.broker = broker
         self.port = port
-        self.client = mqtt.Client()
-        self.client.on_connect = self.on_connect
-        self.client.on_message = self.on_mqtt_message
+        self.client = None # Created on first connect, paho is only loaded if chat is used
         
         self.username = None
         self.on_message_callback = on_message # Callback(msg)
@@ -21,6 +18,11 @@ class ChatClient:
     def connect(self, username):
         try:
             self.username = username
+            if self.client is None:
+                import paho.mqtt.client as mqtt
+                self.client = mqtt.Client()
+                self.client.on_connect = self.on_connect
+                self.client.on_message = self.on_mqtt_message
             self.client.connect(self.broker, self.port, 60)
             self.client.loop_start()
             self.connected = True
@@ -82,5 +84,8 @@ class ChatClient:
         self.send_status_update(None)
 
     def disconnect(self):
+        if self.client is None:
+            return
+        self.connected = False
         self.client.loop_stop()
         self.client.disconnect()
@@ -1,56 +1,276 @@
+import json
 import pygame
 import threading
 import time
 
+# Commands that keep firing while held, buttons fire once per press
+REPEATABLE = {"UP", "DOWN", "LEFT", "RIGHT"}
+
+BUTTONS = {
+    0: "SELECT", # Usually A/Cross
+    1: "BACK"    # Usually B/Circle
+}
+
+# How often the Tk thread pumps pygame's events
+PUMP_MS = 8
+
+class PygameSource:
+    """
+    Controller inputs from pygame, as plain tuples:
+    ("added", id), ("removed", id), ("button", id, button, pressed),
+    ("axis", id, axis, value), ("hat", id, hat, (x, y))
+
+    SDL only supports pumping events on the main thread on some platforms (macOS in
+    particular), so root's Tk thread initializes pygame and pumps its events every
+    PUMP_MS; wait() hands them to the controller thread.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.joysticks = {} # instance id -> Joystick
+        self.pending = [] # [(timestamp, input)] pumped but not yet taken by wait()
+        self.cond = threading.Condition()
+        self.woken = False
+        self.closed = False
+
+    def start(self):
+        self.root.after(0, self._start_pump)
+
+    def _start_pump(self):
+        try:
+            pygame.init()
+            pygame.joystick.init()
+        except pygame.error as e:
+            print(f"Error initializing controllers: {e}")
+            return
+        self._pump()
+
+    def _pump(self):
+        if self.closed:
+            return
+        stamp = time.perf_counter()
+        inputs = []
+        for event in pygame.event.get():
+            translated = self._translate(event)
+            if translated:
+                inputs.append((stamp, translated))
+        if inputs:
+            with self.cond:
+                self.pending.extend(inputs)
+                self.cond.notify_all()
+        self.root.after(PUMP_MS, self._pump)
+
+    def wait(self, timeout):
+        """Blocks until inputs arrive or timeout seconds pass (None waits forever). Returns [(timestamp, input)]."""
+        with self.cond:
+            if not self.pending and not self.woken:
+                self.cond.wait(timeout)
+            self.woken = False
+            inputs, self.pending = self.pending, []
+        return inputs
+
+    def _translate(self, event):
+        if event.type == pygame.JOYDEVICEADDED:
+            joystick = pygame.joystick.Joystick(event.device_index)
+            self.joysticks[joystick.get_instance_id()] = joystick
+            return ("added", joystick.get_instance_id())
+        if event.type == pygame.JOYDEVICEREMOVED:
+            self.joysticks.pop(event.instance_id, None)
+            return ("removed", event.instance_id)
+        if event.type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            return ("button", event.instance_id, event.button, event.type == pygame.JOYBUTTONDOWN)
+        if event.type == pygame.JOYAXISMOTION:
+            return ("axis", event.instance_id, event.axis, event.value)
+        if event.type == pygame.JOYHATMOTION:
+            return ("hat", event.instance_id, event.hat, tuple(event.value))
+        return None
+
+    def wake(self):
+        with self.cond:
+            self.woken = True
+            self.cond.notify_all()
+
+    def close(self):
+        # The Tk thread stops pumping on its next turn
+        self.closed = True
+
+class ReplaySource:
+    """
+    Plays back inputs recorded by ControllerManager(record_file=...) with their
+    original timing (scaled by speed), in place of a real controller.
+    finished is set once every input has been delivered.
+    """
+    def __init__(self, path, speed=1.0):
+        with open(path, "r") as f:
+            self.inputs = [json.loads(line) for line in f if line.strip()]
+        self.speed = speed
+        self.position = 0
+        self.start_time = None
+        self.cond = threading.Condition()
+        self.woken = False
+        self.finished = threading.Event()
+
+    def start(self):
+        self.start_time = time.perf_counter()
+
+    def wait(self, timeout):
+        with self.cond:
+            now = time.perf_counter()
+            if self.position < len(self.inputs):
+                due = self.start_time + self.inputs[self.position][0] / self.speed
+                timeout = due - now if timeout is None else min(timeout, due - now)
+            else:
+                self.finished.set()
+            if not self.woken and (timeout is None or timeout > 0):
+                self.cond.wait(timeout)
+            self.woken = False
+
+            # Deliver everything that is due, stamped with the time it was due
+            now = time.perf_counter()
+            inputs = []
+            while self.position < len(self.inputs):
+                t, *recorded = self.inputs[self.position]
+                due = self.start_time + t / self.speed
+                if due > now:
+                    break
+                if recorded[0] == "hat":
+                    recorded[3] = tuple(recorded[3])
+                inputs.append((due, tuple(recorded)))
+                self.position += 1
+            return inputs
+
+    def wake(self):
+        with self.cond:
+            self.woken = True
+            self.cond.notify_all()
+
+    def close(self):
+        pass
+
 class ControllerManager:
-    def __init__(self, input_callback):
+    """
+    Gamepad input on its own thread. The thread sleeps in the source's wait until an
+    input arrives or the next auto-repeat is due, so an idle controller costs no wakeups.
+    input_callback(command, repeats, stamp) is called from that thread: repeats is 0 for
+    the press itself and counts up while a direction is held, stamp is the
+    time.perf_counter() at which the input (or the repeat) happened. Without a source,
+    inputs come from pygame, pumped on root's Tk thread.
+    """
+    def __init__(self, input_callback, repeat_delay=0.4, repeat_rate=12, axis_press=0.6, axis_release=0.4,
+                 source=None, record_file=None, root=None):
         self.input_callback = input_callback
+        self.repeat_delay = repeat_delay
+        self.repeat_interval = 1 / repeat_rate
+        self.axis_press = axis_press
+        self.axis_release = axis_release
+        self.source = source or PygameSource(root)
+        self.record_file = record_file
         self.running = True
-        self.joysticks = []
-        
-        pygame.init()
-        pygame.joystick.init()
-        
-        self.thread = threading.Thread(target=self._poll_inputs, daemon=True)
+        self.held = {} # (kind, instance id, number[, axis]) -> [command, next repeat time, repeats]
+        self.ready = threading.Event()
+        self.wakeups = 0
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
         self.thread.start()
 
-    def _poll_inputs(self):
-        while self.running:
-            # Check for new controllers
-            if pygame.joystick.get_count() != len(self.joysticks):
-                self.joysticks = [pygame.joystick.Joystick(i) for i in range(pygame.joystick.get_count())]
-                for joy in self.joysticks:
-                    joy.init()
-            
-            for event in pygame.event.get():
-                if event.type == pygame.JOYBUTTONDOWN:
-                    # Button 0 is usually A/Cross (Select)
-                    if event.button == 0:
-                        self.input_callback("SELECT")
-                    # Button 1 is usually B/Circle (Back)
-                    elif event.button == 1:
-                        self.input_callback("BACK")
-                        
-                elif event.type == pygame.JOYAXISMOTION:
-                    # Vertical Axis (usually axis 1)
-                    if event.axis == 1:
-                        if event.value > 0.5:
-                            self.input_callback("DOWN")
-                            time.sleep(0.2) # Debounce
-                        elif event.value < -0.5:
-                            self.input_callback("UP")
-                            time.sleep(0.2)
-                            
-                    # Horizontal Axis (usually axis 0)
-                    elif event.axis == 0:
-                        if event.value > 0.5:
-                            self.input_callback("RIGHT")
-                            time.sleep(0.2)
-                        elif event.value < -0.5:
-                            self.input_callback("LEFT")
-                            time.sleep(0.2)
-            
-            time.sleep(0.01)
+    def _run(self):
+        self.source.start()
+        self.ready.set()
+        # One session per file: timestamps restart at 0, so appending would replay two sessions at once
+        record = open(self.record_file, "w", buffering=1) if self.record_file else None
+        started = time.perf_counter()
+
+        try:
+            while self.running:
+                # Sleep until the next repeat is due, or indefinitely if nothing is held
+                deadline = min((hold[1] for hold in self.held.values() if hold[1] is not None), default=None)
+                timeout = None if deadline is None else max(0, deadline - time.perf_counter())
+                inputs = self.source.wait(timeout)
+                self.wakeups += 1
+                for stamp, event in inputs:
+                    if record:
+                        record.write(json.dumps([round(max(0, stamp - started), 4)] + list(event)) + "\n")
+                    self._handle(stamp, event)
+                self._repeat()
+        finally:
+            self.source.close()
+            if record:
+                record.close()
+
+    def _handle(self, stamp, event):
+        kind, instance = event[0], event[1]
+        if kind == "removed":
+            for source in [s for s in self.held if s[1] == instance]:
+                del self.held[source]
+
+        elif kind == "button":
+            _, _, button, pressed = event
+            source = ("button", instance, button)
+            command = BUTTONS.get(button)
+            if not pressed:
+                self.held.pop(source, None)
+            elif command:
+                self._press(source, command, stamp)
+
+        elif kind == "axis":
+            # Axis 0 is usually horizontal, axis 1 vertical
+            _, _, axis, value = event
+            if axis in (0, 1):
+                negative, positive = ("LEFT", "RIGHT") if axis == 0 else ("UP", "DOWN")
+                self._axis(("axis", instance, axis), value, negative, positive, stamp)
+
+        elif kind == "hat":
+            _, _, hat, (x, y) = event
+            self._hat(("hat", instance, hat, "x"), x, "LEFT", "RIGHT", stamp)
+            self._hat(("hat", instance, hat, "y"), y, "DOWN", "UP", stamp)
+
+    def _axis(self, source, value, negative, positive, stamp):
+        # Hysteresis: press past axis_press, release only once back inside axis_release
+        held = self.held.get(source)
+        if value >= self.axis_press:
+            self._press(source, positive, stamp)
+        elif value <= -self.axis_press:
+            self._press(source, negative, stamp)
+        elif held and abs(value) < self.axis_release:
+            del self.held[source]
+
+    def _hat(self, source, value, negative, positive, stamp):
+        if value > 0:
+            self._press(source, positive, stamp)
+        elif value < 0:
+            self._press(source, negative, stamp)
+        else:
+            self.held.pop(source, None)
+
+    def _press(self, source, command, stamp):
+        held = self.held.get(source)
+        if held and held[0] == command:
+            return
+        # Buttons are tracked until released but never repeat
+        due = stamp + self.repeat_delay if command in REPEATABLE else None
+        self.held[source] = [command, due, 0]
+        self._emit(command, 0, stamp)
+
+    def _repeat(self):
+        now = time.perf_counter()
+        for hold in list(self.held.values()):
+            command, due, repeats = hold
+            if due is None or due > now:
+                continue
+            hold[2] = repeats + 1
+            # If the thread fell behind, resume the cadence from now instead of bursting
+            hold[1] = due + self.repeat_interval
+            if hold[1] <= now:
+                hold[1] = now + self.repeat_interval
+            self._emit(command, hold[2], due)
+
+    def _emit(self, command, repeats, stamp):
+        try:
+            self.input_callback(command, repeats, stamp)
+        except Exception as e:
+            print(f"Error handling controller input {command}: {e}")
 
     def stop(self):
         self.running = False
+        if self.ready.is_set():
+            # Wake the thread from an indefinite wait so it can exit
+            self.source.wake()
@@ -0,0 +1,153 @@
+"""
+Writes the PE fixtures used by test_icon_extractor.py:
+
+icon_pe32.exe    PE32 (x86), icon group "MAINICON": 16x16 32bpp bitmap + 48x48 PNG
+icon_pe32plus.exe  PE32+ (x64), icon group 1: 32x32 32bpp bitmap + 16x16 PNG
+
+Each image is a single .rsrc section with RT_ICON and RT_GROUP_ICON resources,
+nothing else. Run from this directory to regenerate them.
+"""
+import struct
+import zlib
+
+RT_ICON = 3
+RT_GROUP_ICON = 14
+LANG_EN_US = 1033
+FILE_ALIGNMENT = 0x200
+SECTION_ALIGNMENT = 0x1000
+
+def png_icon(size, rgba):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(b"\0" + bytes(rgba) * size for _ in range(size))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+def bmp_icon(size, rgba):
+    # BITMAPINFOHEADER with the height doubled for the AND mask, then BGRA rows bottom-up
+    r, g, b, a = rgba
+    header = struct.pack("<IiiHHIIiiII", 40, size, size * 2, 1, 32, 0, size * size * 4, 0, 0, 0, 0)
+    pixels = bytes((b, g, r, a)) * (size * size)
+    mask_row = ((size + 31) // 32) * 4
+    return header + pixels + b"\0" * (mask_row * size)
+
+def group_icon(entries):
+    # GRPICONDIR + GRPICONDIRENTRY per icon: (size, bit count, payload length, icon id)
+    data = struct.pack("<HHH", 0, 1, len(entries))
+    for size, bit_count, length, icon_id in entries:
+        data += struct.pack("<BBBBHHIH", size % 256, size % 256, 0, 0, 1, bit_count, length, icon_id)
+    return data
+
+def resource_section(section_rva, resources):
+    """resources: {type id: {name (int or str): bytes}}, one en-US language entry each."""
+    # Directory tree first, then the name strings, the data entries and the data itself
+    out = bytearray()
+    fixups = [] # (offset in out, callable returning the value)
+    strings = []
+    leaves = []
+
+    def directory(entries):
+        named = [e for e in entries if isinstance(e[0], str)]
+        ids = sorted((e for e in entries if not isinstance(e[0], str)), key=lambda e: e[0])
+        start = len(out)
+        out.extend(struct.pack("<IIHHHH", 0, 0, 0, 0, len(named), len(ids)))
+        slots = []
+        for key, child in named + ids:
+            slots.append((len(out), key, child))
+            out.extend(b"\0" * 8)
+        return start, slots
+
+    def fill(slots):
+        for slot, key, child in slots:
+            if isinstance(key, str):
+                strings.append((slot, key))
+            else:
+                struct.pack_into("<I", out, slot, key)
+            if isinstance(child, list):
+                start, child_slots = directory(child)
+                struct.pack_into("<I", out, slot + 4, 0x80000000 | start)
+                fill(child_slots)
+            else:
+                leaves.append((slot + 4, child))
+
+    tree = [(type_id, [(name, [(LANG_EN_US, data)]) for name, data in names.items()])
+            for type_id, names in sorted(resources.items())]
+    _, slots = directory(tree)
+    fill(slots)
+
+    for slot, name in strings:
+        struct.pack_into("<I", out, slot, 0x80000000 | len(out))
+        encoded = name.encode("utf-16-le")
+        out.extend(struct.pack("<H", len(name)) + encoded)
+    while len(out) % 4:
+        out.append(0)
+
+    entries = []
+    for slot, data in leaves:
+        struct.pack_into("<I", out, slot, len(out))
+        entries.append((len(out), data))
+        out.extend(b"\0" * 16)
+    for entry, data in entries:
+        while len(out) % 8:
+            out.append(0)
+        struct.pack_into("<IIII", out, entry, section_rva + len(out), len(data), 0, 0)
+        out.extend(data)
+    return bytes(out)
+
+def pe_image(plus, resources):
+    rsrc = resource_section(SECTION_ALIGNMENT, resources)
+    raw_size = -(-len(rsrc) // FILE_ALIGNMENT) * FILE_ALIGNMENT
+    image_size = SECTION_ALIGNMENT + -(-len(rsrc) // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+    dos = bytearray(64)
+    dos[0:2] = b"MZ"
+    struct.pack_into("<I", dos, 0x3C, 64)
+
+    optional_size = 240 if plus else 224
+    coff = struct.pack("<HHIIIHH", 0x8664 if plus else 0x14C, 1, 0, 0, 0, optional_size, 0x0102 if not plus else 0x0022)
+
+    optional = bytearray(optional_size)
+    struct.pack_into("<H", optional, 0, 0x20B if plus else 0x10B)
+    if plus:
+        struct.pack_into("<Q", optional, 24, 0x140000000) # ImageBase
+    else:
+        struct.pack_into("<I", optional, 28, 0x400000)
+    struct.pack_into("<II", optional, 32, SECTION_ALIGNMENT, FILE_ALIGNMENT)
+    struct.pack_into("<HH", optional, 40, 6, 0) # OS version
+    struct.pack_into("<HH", optional, 48, 6, 0) # Subsystem version
+    struct.pack_into("<II", optional, 56, image_size, FILE_ALIGNMENT) # SizeOfImage, SizeOfHeaders
+    struct.pack_into("<H", optional, 68, 2) # Windows GUI
+    dirs = 112 if plus else 96
+    struct.pack_into("<I", optional, dirs - 4, 16) # NumberOfRvaAndSizes
+    struct.pack_into("<II", optional, dirs + 2 * 8, SECTION_ALIGNMENT, len(rsrc)) # Resource directory
+
+    section = struct.pack("<8sIIIIIIHHI", b".rsrc", len(rsrc), SECTION_ALIGNMENT, raw_size, FILE_ALIGNMENT,
+                          0, 0, 0, 0, 0x40000040)
+
+    headers = bytes(dos) + b"PE\0\0" + coff + bytes(optional) + section
+    headers += b"\0" * (FILE_ALIGNMENT - len(headers))
+    return headers + rsrc + b"\0" * (raw_size - len(rsrc))
+
+def icon_resources(group_name, icons):
+    """icons: [(icon id, size, payload)]"""
+    return {
+        RT_ICON: {icon_id: payload for icon_id, size, payload in icons},
+        RT_GROUP_ICON: {group_name: group_icon([(size, 32, len(payload), icon_id) for icon_id, size, payload in icons])}
+    }
+
+FIXTURES = {
+    "icon_pe32.exe": (False, icon_resources("MAINICON", [
+        (1, 16, bmp_icon(16, (255, 0, 0, 255))),
+        (2, 48, png_icon(48, (0, 128, 255, 255)))
+    ])),
+    "icon_pe32plus.exe": (True, icon_resources(1, [
+        (1, 16, png_icon(16, (255, 255, 0, 255))),
+        (2, 32, bmp_icon(32, (0, 200, 0, 255)))
+    ]))
+}
+
+if __name__ == "__main__":
+    for name, (plus, resources) in FIXTURES.items():
+        with open(name, "wb") as f:
+            f.write(pe_image(plus, resources))
+        print(f"Wrote {name}")
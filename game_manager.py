@@ -1,58 +1,112 @@
-import json
+import bisect
 import os
 import time
+import zlib
+from collections import defaultdict
 from icon_extractor import extract_icon
 
 from metadata_fetcher import fetch_metadata
+from search_index import SearchIndex
+from storage import open_storage
 
 class GameManager:
-    def __init__(self, data_file="games.json", icons_dir="icons"):
+    def __init__(self, data_file="games.json", icons_dir="icons", storage=None, persister=None):
         self.data_file = data_file
         self.icons_dir = icons_dir
+        self.storage = storage or open_storage(data_file)
+        self.persister = persister
         self.games = self.load_games()
         
+        # Indexes, kept consistent by every mutation below
+        self.by_path = {}                    # path -> game record
+        self.by_category = defaultdict(set)  # category -> paths
+        self.favorites = set()               # paths
+        self.search_index = SearchIndex()
+        self.sorted_cache = {}               # category (None = all) -> sorted records
+        for game in self.games:
+            self._index_game(game)
+        self.search_index.sort()
+        
         if not os.path.exists(self.icons_dir):
             os.makedirs(self.icons_dir)
 
     def load_games(self):
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, "r") as f:
-                    games = json.load(f)
-                    valid_games = []
-                    # Ensure all fields exist for backward compatibility and filter invalid ones
-                    for game in games:
-                        if "name" not in game or "path" not in game:
-                            continue # Skip invalid entries
-                            
-                        game.setdefault("favorite", False)
-                        game.setdefault("play_time", 0)
-                        game.setdefault("description", "")
-                        game.setdefault("last_played", None)
-                        game.setdefault("categories", [])
-                        game.setdefault("launch_args", "")
-                        valid_games.append(game)
-                    return valid_games
-            except json.JSONDecodeError:
-                return []
-        return []
+        valid_games = []
+        # Ensure all fields exist for backward compatibility and filter invalid ones
+        for game in self.storage.load():
+            if "name" not in game or "path" not in game:
+                continue # Skip invalid entries
+                
+            game.setdefault("favorite", False)
+            game.setdefault("play_time", 0)
+            game.setdefault("description", "")
+            game.setdefault("last_played", None)
+            game.setdefault("categories", [])
+            game.setdefault("launch_args", "")
+            valid_games.append(game)
+        return valid_games
+
+    def _index_game(self, game):
+        path = game["path"]
+        self.by_path[path] = game
+        for cat in game.get("categories", []):
+            self.by_category[cat].add(path)
+        if game.get("favorite"):
+            self.favorites.add(path)
+        self.search_index.add(path, game["name"], pinned=bool(game.get("favorite")))
+        self.sorted_cache.clear()
+
+    def _unindex_game(self, game):
+        path = game["path"]
+        self.by_path.pop(path, None)
+        for cat in game.get("categories", []):
+            paths = self.by_category.get(cat)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.by_category[cat]
+        self.favorites.discard(path)
+        self.search_index.remove(path)
+        self.sorted_cache.clear()
+
+    def get_game(self, path):
+        return self.by_path.get(path)
 
     def save_games(self):
-        with open(self.data_file, "w") as f:
-            json.dump(self.games, f, indent=4)
+        # Full rewrite, single-game changes go through save_game
+        if self.persister:
+            self.persister.submit(("games", None), self.storage.save_all, [dict(g) for g in self.games])
+        else:
+            self.storage.save_all(self.games)
+
+    def save_game(self, game):
+        if self.persister:
+            self.persister.submit(("games", game["path"]), self.storage.put, dict(game))
+        else:
+            self.storage.put(game)
+
+    def delete_game(self, path):
+        if self.persister:
+            self.persister.submit(("games", path), self.storage.delete, path)
+        else:
+            self.storage.delete(path)
 
     def add_game(self, file_path):
         if not os.path.exists(file_path):
             return False, "File does not exist."
         
         # Check if already exists
-        for game in self.games:
-            if game["path"] == file_path:
-                return False, "Game already added."
+        if file_path in self.by_path:
+            return False, "Game already added."
         
+        return self.insert_game(self.prepare_game(file_path))
+
+    def prepare_game(self, file_path):
+        # Slow part of adding a game (icon extraction, network), safe to run on a worker thread
         name = os.path.splitext(os.path.basename(file_path))[0]
-        icon_filename = f"{name}.png"
-        icon_path = os.path.join(self.icons_dir, icon_filename)
+        # Named after the full path: workers preparing two executables with the same name at once
+        # must not pick the same file
+        icon_path = os.path.join(self.icons_dir, f"{name}-{zlib.crc32(file_path.encode()):08x}.png")
         
         # Extract icon
         extracted_path = extract_icon(file_path, icon_path)
@@ -71,7 +125,7 @@ class GameManager:
         except Exception as e:
             print(f"Error auto-fetching metadata: {e}")
 
-        game_data = {
+        return {
             "name": name,
             "path": file_path,
             "icon": icon_path,
@@ -79,61 +133,106 @@ class GameManager:
             "play_time": 0,
             "description": description,
             "last_played": None,
-            "categories": categories
+            "categories": categories,
+            "launch_args": ""
         }
-        
+
+    def insert_game(self, game_data):
+        if game_data["path"] in self.by_path:
+            return False, "Game already added."
         self.games.append(game_data)
-        self.save_games()
+        self._index_game(game_data)
+        self.save_game(game_data)
         return True, "Game added successfully."
 
-    def get_games(self):
-        # Filter out invalid games (missing name) and Sort: Favorites first, then alphabetical
-        valid_games = [g for g in self.games if "name" in g and g["name"]]
-        return sorted(valid_games, key=lambda x: (not x.get("favorite", False), x["name"].lower()))
+    def _sort_key(self, game):
+        return (not game.get("favorite", False), game["name"].lower())
+
+    def get_games(self, category=None):
+        # Favorites first, then alphabetical; cached until a mutation changes the order
+        if category not in self.sorted_cache:
+            if category is None:
+                games = [g for g in self.by_path.values() if g.get("name")]
+            else:
+                games = [self.by_path[p] for p in self.by_category.get(category, ()) if self.by_path[p].get("name")]
+            self.sorted_cache[category] = sorted(games, key=self._sort_key)
+        return self.sorted_cache[category]
+
+    def search(self, query, category=None):
+        # Best matches first, then the usual favorites/alphabetical order, capped at RESULT_LIMIT
+        within = self.by_category.get(category, set()) if category is not None else None
+        paths = self.search_index.top(query, within=within)
+        return [self.by_path[p] for p in paths if self.by_path[p].get("name")]
 
     def remove_game(self, index):
         if 0 <= index < len(self.games):
-            del self.games[index]
-            self.save_games()
+            game = self.games.pop(index)
+            self._unindex_game(game)
+            self.delete_game(game["path"])
             return True
         return False
 
     def toggle_favorite(self, path):
-        for game in self.games:
-            if game["path"] == path:
-                game["favorite"] = not game.get("favorite", False)
-                self.save_games()
-                return True
-        return False
+        game = self.by_path.get(path)
+        if game is None:
+            return False
+        # The record moves within the cached lists instead of them being sorted again
+        cached = self._take_sorted(game)
+        game["favorite"] = not game.get("favorite", False)
+        if game["favorite"]:
+            self.favorites.add(path)
+        else:
+            self.favorites.discard(path)
+        self.search_index.set_pinned(path, game["favorite"])
+        for games in cached:
+            bisect.insort(games, game, key=self._sort_key)
+        self.save_game(game)
+        return True
+
+    def _take_sorted(self, game):
+        # Removes the record from the cached sorted lists holding it, returns those lists
+        if not game.get("name"):
+            return []
+        key = self._sort_key(game)
+        cached = []
+        for category in [None] + game.get("categories", []):
+            games = self.sorted_cache.get(category)
+            if games is None:
+                continue
+            # Records with the same key follow each other
+            i = bisect.bisect_left(games, key, key=self._sort_key)
+            while games[i] is not game:
+                i += 1
+            del games[i]
+            cached.append(games)
+        return cached
 
     def update_play_time(self, path, duration_seconds):
-        for game in self.games:
-            if game["path"] == path:
-                current_time = game.get("play_time", 0)
-                game["play_time"] = current_time + duration_seconds
-                game["last_played"] = time.time()
-                self.save_games()
-                return True
-        return False
+        game = self.by_path.get(path)
+        if game is None:
+            return False
+        current_time = game.get("play_time", 0)
+        game["play_time"] = current_time + duration_seconds
+        game["last_played"] = time.time()
+        self.save_game(game)
+        return True
 
     def update_metadata(self, path, name, description, icon_path=None, categories=None, launch_args=None):
-        for game in self.games:
-            if game["path"] == path:
-                game["name"] = name
-                game["description"] = description
-                if icon_path:
-                    game["icon"] = icon_path
-                if categories is not None:
-                    game["categories"] = categories
-                if launch_args is not None:
-                    game["launch_args"] = launch_args
-                self.save_games()
-                return True
-        return False
+        game = self.by_path.get(path)
+        if game is None:
+            return False
+        self._unindex_game(game)
+        game["name"] = name
+        game["description"] = description
+        if icon_path:
+            game["icon"] = icon_path
+        if categories is not None:
+            game["categories"] = categories
+        if launch_args is not None:
+            game["launch_args"] = launch_args
+        self._index_game(game)
+        self.save_game(game)
+        return True
 
     def get_categories(self):
-        categories = set()
-        for game in self.games:
-            for cat in game.get("categories", []):
-                categories.add(cat)
-        return sorted(list(categories))
+        return sorted(self.by_category)
@@ -1,17 +1,33 @@
 import wave
 import math
+import os
 import struct
 import random
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+# The launcher's UI sounds. adsr = (attack s, decay s, sustain level, release s)
+UI_SOUNDS = {
+    "hover": {"frequency": 600, "duration": 0.05, "volume": 0.2, "voice": "sine", "adsr": (0.002, 0.01, 0.7, 0.03)},
+    "click": {"frequency": 1000, "duration": 0.1, "volume": 0.3, "voice": "sine", "adsr": (0.002, 0.02, 0.5, 0.06)},
+    "launch": {"frequency": 400, "duration": 0.5, "volume": 0.5, "voice": "square", "adsr": (0.01, 0.1, 0.6, 0.25)},
+    "back": {"frequency": 300, "duration": 0.1, "volume": 0.3, "voice": "sine", "adsr": (0.002, 0.02, 0.5, 0.06)}
+}
+
+# pygame mixer sample formats (see pygame.mixer.get_init) -> numpy type
+MIXER_FORMATS = {-8: np.int8, 8: np.uint8, -16: np.int16, 16: np.uint16, -32: np.int32, 32: np.float32}
 
 def generate_tone(filename, frequency=440, duration=0.1, volume=0.5, type="sine"):
+    # Original per-sample writer, kept as the baseline for --benchmark
     sample_rate = 44100
     n_samples = int(sample_rate * duration)
-    
+
     with wave.open(filename, 'w') as wav_file:
         wav_file.setnchannels(1)
         wav_file.setsampwidth(2)
         wav_file.setframerate(sample_rate)
-        
+
         for i in range(n_samples):
             t = float(i) / sample_rate
             if type == "sine":
@@ -20,16 +36,107 @@ def generate_tone(filename, frequency=440, duration=0.1, volume=0.5, type="sine"
                 value = 1.0 if math.sin(2.0 * math.pi * frequency * t) > 0 else -1.0
             elif type == "noise":
                 value = random.uniform(-1, 1)
-            
+
             # Apply envelope (fade out)
             envelope = 1.0 - (i / n_samples)
-            
+
             data = int(value * volume * envelope * 32767.0)
             wav_file.writeframes(struct.pack('<h', data))
 
+def adsr_envelope(n_samples, sample_rate, attack, decay, sustain, release):
+    a, d, r = (int(seconds * sample_rate) for seconds in (attack, decay, release))
+    if a + d + r > n_samples:
+        # Sound shorter than its envelope: shrink the stages proportionally
+        scale = n_samples / (a + d + r)
+        a, d = int(a * scale), int(d * scale)
+        r = n_samples - a - d
+    return np.concatenate([
+        np.linspace(0, 1, a, endpoint=False),
+        np.linspace(1, sustain, d, endpoint=False),
+        np.full(n_samples - a - d - r, sustain),
+        np.linspace(sustain, 0, r)
+    ]).astype(np.float32)
+
+def render(frequency=440, duration=0.1, volume=0.5, voice="sine", adsr=(0.005, 0.02, 0.7, 0.05),
+           sample_rate=SAMPLE_RATE, seed=0):
+    """Renders a whole tone in one pass, returns float32 samples in [-1, 1]."""
+    n_samples = int(sample_rate * duration)
+    phase = frequency * np.arange(n_samples, dtype=np.float64) / sample_rate # in cycles
+    if voice == "sine":
+        wave_data = np.sin(2 * np.pi * phase)
+    elif voice == "square":
+        wave_data = np.where(phase % 1 < 0.5, 1.0, -1.0)
+    elif voice == "saw":
+        wave_data = 2 * (phase % 1) - 1
+    elif voice == "noise":
+        wave_data = np.random.default_rng(seed).uniform(-1, 1, n_samples)
+    else:
+        raise ValueError(f"Unknown voice {voice}")
+    return (wave_data * adsr_envelope(n_samples, sample_rate, *adsr) * volume).astype(np.float32)
+
+def to_pcm(samples, dtype=np.int16, channels=1):
+    """Converts float samples to interleaved PCM of the given numpy type."""
+    if np.issubdtype(dtype, np.floating):
+        pcm = samples.astype(dtype)
+    else:
+        info = np.iinfo(dtype)
+        # Unsigned formats are centered on the middle of their range. Scaled in float64:
+        # float32 rounds the int32 maximum up to 2**31, which would wrap around
+        center = (int(info.max) + int(info.min) + 1) // 2
+        pcm = (samples.astype(np.float64) * (info.max - center) + center).astype(dtype)
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+    return np.ascontiguousarray(pcm)
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(to_pcm(samples).astype("<i2").tobytes())
+
+def write_all(directory="sounds"):
+    """Writes every UI sound to directory."""
+    os.makedirs(directory, exist_ok=True)
+    for name, params in UI_SOUNDS.items():
+        write_wav(os.path.join(directory, f"{name}.wav"), render(**params))
+
+def make_sound(name):
+    """Renders a UI sound straight into a pygame Sound matching the mixer's format, no file involved."""
+    import pygame
+    frequency, size, channels = pygame.mixer.get_init()
+    samples = render(**UI_SOUNDS[name], sample_rate=frequency)
+    return pygame.mixer.Sound(buffer=to_pcm(samples, MIXER_FORMATS[size], channels).tobytes())
+
+def benchmark(directory):
+    import time
+    os.makedirs(directory, exist_ok=True)
+
+    start = time.perf_counter()
+    for name, params in UI_SOUNDS.items():
+        generate_tone(os.path.join(directory, f"legacy_{name}.wav"), params["frequency"], params["duration"],
+                      params["volume"], params["voice"])
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_all(directory)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for params in UI_SOUNDS.values():
+        to_pcm(render(**params), channels=2).tobytes()
+    in_memory = time.perf_counter() - start
+
+    print(f"Per-sample writer: {legacy * 1000:.1f}ms")
+    print(f"Vectorized to WAV: {vectorized * 1000:.1f}ms ({legacy / vectorized:.0f}x)")
+    print(f"Vectorized buffers (stereo, no files): {in_memory * 1000:.1f}ms ({legacy / in_memory:.0f}x)")
+
 if __name__ == "__main__":
-    generate_tone("sounds/hover.wav", frequency=600, duration=0.05, volume=0.2)
-    generate_tone("sounds/click.wav", frequency=1000, duration=0.1, volume=0.3)
-    generate_tone("sounds/launch.wav", frequency=400, duration=0.5, volume=0.5, type="square")
-    generate_tone("sounds/back.wav", frequency=300, duration=0.1, volume=0.3)
-    print("Sounds generated.")
+    import sys
+    if "--benchmark" in sys.argv:
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            benchmark(directory)
+    else:
+        write_all("sounds")
+        print("Sounds generated.")
@@ -1,55 +1,174 @@
-import win32ui
-import win32gui
-import win32con
-import win32api
-from PIL import Image
+import io
+import mmap
 import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+RT_ICON = 3
+RT_GROUP_ICON = 14
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class PEFormatError(Exception):
+    pass
+
+class PEResources:
+    """
+    Minimal reader for the resource directory of a PE (Windows .exe/.dll) image.
+    Works on any buffer supporting struct.unpack_from and slicing, e.g. an mmap.
+    """
+    def __init__(self, data):
+        self.data = data
+        if data[:2] != b"MZ":
+            raise PEFormatError("Not an MZ executable")
+        pe_offset = self._u32(0x3C)
+        if data[pe_offset:pe_offset + 4] != b"PE\0\0":
+            raise PEFormatError("Missing PE signature")
+
+        num_sections = self._u16(pe_offset + 6)
+        optional_size = self._u16(pe_offset + 20)
+        optional = pe_offset + 24
+        magic = self._u16(optional)
+        if magic == 0x10B: # PE32
+            num_dirs, dirs = self._u32(optional + 92), optional + 96
+        elif magic == 0x20B: # PE32+
+            num_dirs, dirs = self._u32(optional + 108), optional + 112
+        else:
+            raise PEFormatError(f"Unknown optional header magic {magic:#x}")
+        if num_dirs < 3:
+            raise PEFormatError("No resource directory")
+        resource_rva = self._u32(dirs + 2 * 8)
+
+        self.sections = []
+        table = optional + optional_size
+        for i in range(num_sections):
+            entry = table + i * 40
+            virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from("<IIII", data, entry + 8)
+            self.sections.append((virtual_address, max(virtual_size, raw_size), raw_pointer))
+
+        self.resource_base = self.rva_to_offset(resource_rva) if resource_rva else None
+
+    def _u16(self, offset):
+        return struct.unpack_from("<H", self.data, offset)[0]
+
+    def _u32(self, offset):
+        return struct.unpack_from("<I", self.data, offset)[0]
+
+    def rva_to_offset(self, rva):
+        for virtual_address, size, raw_pointer in self.sections:
+            if virtual_address <= rva < virtual_address + size:
+                return rva - virtual_address + raw_pointer
+        raise PEFormatError(f"RVA {rva:#x} is outside every section")
+
+    def _entries(self, directory_offset):
+        # IMAGE_RESOURCE_DIRECTORY followed by its named and id entries
+        base = self.resource_base + directory_offset
+        named, ids = struct.unpack_from("<HH", self.data, base + 12)
+        for i in range(named + ids):
+            name, target = struct.unpack_from("<II", self.data, base + 16 + i * 8)
+            if name & 0x80000000:
+                string_offset = self.resource_base + (name & 0x7FFFFFFF)
+                length = self._u16(string_offset)
+                key = bytes(self.data[string_offset + 2:string_offset + 2 + length * 2]).decode("utf-16-le")
+            else:
+                key = name
+            yield key, target
+
+    def _first_leaf(self, target):
+        # Descend through subdirectories (language level) to the first data entry
+        while target & 0x80000000:
+            entries = list(self._entries(target & 0x7FFFFFFF))
+            if not entries:
+                return None
+            target = entries[0][1]
+        rva, size = struct.unpack_from("<II", self.data, self.resource_base + target)
+        offset = self.rva_to_offset(rva)
+        return self.data[offset:offset + size]
+
+    def _names(self, resource_type):
+        # (name or id, directory entry target) of every resource of the type, without reading them
+        if self.resource_base is None:
+            return
+        for key, target in self._entries(0):
+            if key == resource_type and target & 0x80000000:
+                yield from self._entries(target & 0x7FFFFFFF)
+                return
+
+    def resources(self, resource_type):
+        """Returns {name or id: raw bytes} for every resource of the given type."""
+        return {name: self._first_leaf(target) for name, target in self._names(resource_type)}
+
+    def resource(self, resource_type, name=None):
+        """Raw bytes of one resource of the type (the first one if name is None), or None."""
+        for key, target in self._names(resource_type):
+            if name is None or key == name:
+                return self._first_leaf(target)
+        return None
+
+def _best_icon(pe):
+    # Explorer uses the first icon group as the application icon
+    group = pe.resource(RT_GROUP_ICON)
+    if not group:
+        return None
+    _, _, count = struct.unpack_from("<HHH", group, 0)
+
+    best = None
+    for i in range(count):
+        width, height, colors, _, planes, bit_count, size, icon_id = struct.unpack_from("<BBBBHHIH", group, 6 + i * 14)
+        width, height = width or 256, height or 256
+        score = (width * height, bit_count)
+        if best is None or score > best[0]:
+            best = (score, (width, height, colors, planes, bit_count, icon_id))
+    if best is None:
+        return None
+
+    width, height, colors, planes, bit_count, icon_id = best[1]
+    # Only the chosen icon is copied out of the image
+    data = pe.resource(RT_ICON, icon_id)
+    if not data:
+        return None
+    return width, height, colors, planes, bit_count, bytes(data)
 
 def extract_icon(exe_path, output_path):
     """
-    Extracts the large icon from a Windows executable and saves it as a PNG.
+    Extracts the largest icon from a Windows executable and saves it as a PNG.
+    PNG-compressed entries are written as is, bitmap entries are decoded with PIL.
     """
     try:
-        # Get the large icon handle
-        large, small = win32gui.ExtractIconEx(exe_path, 0)
-        
-        if not large:
+        with open(exe_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                icon = _best_icon(PEResources(data))
+
+        if not icon:
             print(f"No icon found for {exe_path}")
             return None
+        width, height, colors, planes, bit_count, payload = icon
+
+        # Workers extracting in parallel may all create the directory at once
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        hIcon = large[0]
-        
-        # Create a PyCBitmap from the icon
-        hdc = win32ui.CreateDCFromHandle(win32gui.GetDC(0))
-        hbmp = win32ui.CreateBitmap()
-        hbmp.CreateCompatibleBitmap(hdc, 32, 32)
-        hdc = hdc.CreateCompatibleDC()
-        hdc.SelectObject(hbmp)
-        
-        # Draw the icon
-        hdc.DrawIcon((0, 0), hIcon)
-        
-        # Convert to PIL Image
-        bmpinfo = hbmp.GetInfo()
-        bmpstr = hbmp.GetBitmapBits(True)
-        img = Image.frombuffer(
-            'RGBA',
-            (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-            bmpstr, 'raw', 'BGRA', 0, 1
-        )
-        
-        # Save
-        if not os.path.exists(os.path.dirname(output_path)):
-            os.makedirs(os.path.dirname(output_path))
-            
-        img.save(output_path)
-        
-        # Cleanup
-        win32gui.DestroyIcon(hIcon)
-        win32gui.DestroyIcon(small[0]) if small else None
-        
+        if payload.startswith(PNG_SIGNATURE):
+            with open(output_path, "wb") as out:
+                out.write(payload)
+            return output_path
+
+        # Bitmap icon: wrap it in a one-entry .ico so PIL can decode the DIB and its mask
+        from PIL import Image
+        header = struct.pack("<HHH", 0, 1, 1)
+        entry = struct.pack("<BBBBHHII", width % 256, height % 256, colors, 0, planes, bit_count, len(payload), 6 + 16)
+        img = Image.open(io.BytesIO(header + entry + payload))
+        img.convert("RGBA").save(output_path)
         return output_path
-        
+
     except Exception as e:
         print(f"Error extracting icon: {e}")
         return None
+
+def extract_icons(jobs, max_workers=4):
+    """
+    Extracts icons for many (exe_path, output_path) pairs on a worker pool.
+    Returns the results of extract_icon in the same order.
+    """
+    jobs = list(jobs)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda job: extract_icon(*job), jobs))
@@ -0,0 +1,98 @@
+import os
+import threading
+from collections import OrderedDict
+import customtkinter as ctk
+from PIL import Image
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+class ImageCache:
+    """
+    Process-wide cache of decoded icons, keyed by (path, mtime, size).
+    Least recently used entries are evicted once the decoded pixels exceed the budget.
+    """
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict() # key -> (CTkImage, cost)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, size):
+        """Returns a CTkImage for path at size, or None if the file is missing or unreadable."""
+        if not path:
+            return None
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        key = (path, mtime, tuple(size))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        try:
+            with Image.open(path) as pil_image:
+                pil_image.load()
+                # CTkImage rescales for the widget scaling, keep a copy detached from the file
+                pil_image = pil_image.copy()
+        except Exception as e:
+            print(f"Error loading icon: {e}")
+            return None
+
+        image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=tuple(size))
+        # Decoded source plus the scaled photo image CTkImage keeps per scaling
+        cost = pil_image.width * pil_image.height * len(pil_image.getbands()) + size[0] * size[1] * 4
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (image, cost)
+                self.used_bytes += cost
+                self._evict()
+        return image
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone exceeds the budget
+        while self.used_bytes > self.budget_bytes and len(self.entries) > 1:
+            _, (_, cost) = self.entries.popitem(last=False)
+            self.used_bytes -= cost
+            self.evictions += 1
+
+    def set_budget(self, budget_bytes):
+        with self.lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.used_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "used_bytes": self.used_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+icon_cache = ImageCache()
+
+_blank_images = {}
+
+def blank_image(size):
+    # Transparent placeholder, so a recycled widget can drop its previous icon
+    if size not in _blank_images:
+        pil_image = Image.new("RGBA", size, (0, 0, 0, 0))
+        _blank_images[size] = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=size)
+    return _blank_images[size]
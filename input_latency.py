@@ -0,0 +1,82 @@
+"""
+Controller latency benchmark.
+
+Record a session:   GAMELAUNCHER_RECORD_INPUT=input.jsonl python app.py
+Replay it:          python input_latency.py input.jsonl [--speed 1] [--max-p95-ms 50]
+
+The replay runs the real app, in a window laid out off-screen, and feeds the recording through
+ControllerManager and handle_controller_input: the app's controller stage gets a
+replay source in place of the joystick. Games are not launched, the tray, sounds and
+loudness analysis are not started and nothing is saved on exit. Reports p50/p95/p99
+of input-to-handler and input-to-redraw latency; exits with 1 if a --max-p95-ms
+budget is exceeded. A recording holds one session, recording again overwrites it.
+"""
+import argparse
+import sys
+import time
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+class LatencyStats:
+    """Latencies (seconds) from a controller input to the Tk handler running, and to the following idle redraw."""
+    def __init__(self):
+        self.handler = []
+        self.redraw = []
+
+    def handled(self, stamp):
+        self.handler.append(time.perf_counter() - stamp)
+
+    def redrawn(self, stamp):
+        self.redraw.append(time.perf_counter() - stamp)
+
+    def summary(self):
+        return {name: {p: percentile(values, p) * 1000 for p in (50, 95, 99)}
+                for name, values in (("handler", self.handler), ("redraw", self.redraw))}
+
+    def report(self):
+        lines = [f"{len(self.handler)} inputs"]
+        for name, points in self.summary().items():
+            lines.append(f"input-to-{name}: p50 {points[50]:.2f}ms, p95 {points[95]:.2f}ms, p99 {points[99]:.2f}ms")
+        return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="fail if input-to-redraw p95 exceeds this")
+    args = parser.parse_args()
+
+    from app import GameLauncherApp
+    from controller_manager import ReplaySource
+
+    source = ReplaySource(args.recording, speed=args.speed)
+    app = GameLauncherApp(controller_source=source, replay=True)
+    app.launch_game = lambda path: None # Navigation only, never start games
+    app.input_latency = LatencyStats()
+
+    def check_finished():
+        if source.finished.is_set():
+            # Give the last inputs time to reach the handler and redraw
+            app.after(500, app.quit)
+        else:
+            app.after(100, check_finished)
+
+    app.after(100, check_finished)
+    app.mainloop()
+
+    print(app.input_latency.report())
+    code = 0
+    if args.max_p95_ms is not None:
+        p95 = app.input_latency.summary()["redraw"][95]
+        if p95 > args.max_p95_ms:
+            print(f"OVER BUDGET: input-to-redraw p95 {p95:.2f}ms > {args.max_p95_ms}ms")
+            code = 1
+    app.quit_app()
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Executables that ship next to games but are not the game itself
+SKIP_NAME_PARTS = (
+    "unins", "setup", "install", "redist", "crash", "report", "dxwebsetup",
+    "dotnet", "vcredist", "vc_redist", "update", "patch", "helper", "anticheat",
+    "cleanup", "uninstall", "config", "server", "benchmark"
+)
+SKIP_DIRS = {
+    "_commonredist", "redist", "redistributables", "directx", "dotnet", "vcredist",
+    "__installer", "installer", "prerequisites", "support", "easyanticheat",
+    "battleye", "engine", "$recycle.bin", "windows"
+}
+
+def find_executables(roots, cancel_event=None):
+    """Yields candidate game executables under roots (files in roots are yielded as is)."""
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            dirnames[:] = [d for d in dirnames if d.lower() not in SKIP_DIRS and not d.startswith(".")]
+            for filename in filenames:
+                lower = filename.lower()
+                if not lower.endswith(".exe"):
+                    continue
+                if any(part in lower for part in SKIP_NAME_PARTS):
+                    continue
+                yield os.path.join(dirpath, filename)
+
+class BoundedScanner:
+    """
+    Walks directory trees on a thread and hands the work for each file to a bounded
+    worker pool. jobs(roots) yields an argument tuple for each file and work(*job)
+    processes one; both queue their results as (kind, data) events for the Tk thread,
+    read with poll().
+    """
+    # Events that complete one found file
+    DONE_EVENTS = ()
+
+    def __init__(self, jobs, work, max_workers=4):
+        self.jobs = jobs
+        self.work = work
+        self.max_workers = max_workers
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+        self.found = 0
+        self.done = 0
+        self.finished = False
+
+    def start(self, roots):
+        self.thread = threading.Thread(target=self._run, args=(list(roots),), daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run(self, roots):
+        # Bound the number of queued jobs so a huge tree never piles up futures
+        slots = threading.BoundedSemaphore(self.max_workers * 2)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for job in self.jobs(roots):
+                while not slots.acquire(timeout=0.2):
+                    if self.cancel_event.is_set():
+                        break
+                if self.cancel_event.is_set():
+                    break
+                future = executor.submit(self._start_work, job)
+                future.add_done_callback(lambda f: slots.release())
+            if self.cancel_event.is_set():
+                executor.shutdown(wait=True, cancel_futures=True)
+        self.events.put(("finished", None))
+
+    def _start_work(self, job):
+        if self.cancel_event.is_set():
+            return
+        self.work(*job)
+
+    def poll(self, max_events=50):
+        """Returns up to max_events queued events without blocking, for the Tk thread."""
+        events = []
+        while len(events) < max_events:
+            try:
+                kind, data = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind in self.DONE_EVENTS:
+                self.done += 1
+            elif kind == "finished":
+                self.finished = True
+            events.append((kind, data))
+        return events
+
+class LibraryScanner(BoundedScanner):
+    """
+    Walks directory trees and prepares games (icon extraction, metadata lookup)
+    on a bounded worker pool. Results are queued for the Tk thread, which inserts
+    them into the library as they arrive via poll().
+    """
+    DONE_EVENTS = ("prepared", "failed")
+
+    def __init__(self, game_manager, max_workers=4):
+        super().__init__(self._jobs, self._work, max_workers)
+        self.game_manager = game_manager
+
+    def _jobs(self, roots):
+        for path in find_executables(roots, self.cancel_event):
+            if self.game_manager.get_game(path) is not None:
+                continue
+            self.found += 1
+            yield (path,)
+
+    def _work(self, path):
+        try:
+            game_data = self.game_manager.prepare_game(path)
+            self.events.put(("prepared", game_data))
+        except Exception as e:
+            self.events.put(("failed", (path, str(e))))
@@ -0,0 +1,236 @@
+import math
+import sys
+import customtkinter as ctk
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only keeps enough item widgets alive to fill the viewport.
+    Widgets are built once by item_factory(parent) and rebound with widget.set_data(item)
+    as the user scrolls, so redraw cost depends on the viewport size, not the item count.
+    One item can have the focus (controller/keyboard navigation); widgets that define
+    set_focused(bool) are told when they gain or lose it.
+    """
+    def __init__(self, master, item_factory, row_height, columns=1, overscan=2, label_text="", empty_text="", **kwargs):
+        super().__init__(master, **kwargs)
+        self.item_factory = item_factory
+        self.row_height = row_height
+        self.columns = columns
+        self.overscan = overscan
+        self.empty_text = empty_text
+
+        self.items = []
+        self.pool = [] # Recycled item widgets, slot = item index % len(pool)
+        self.offset = 0 # Scroll position in (unscaled) pixels
+        self.focus_index = None
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.label = ctk.CTkLabel(self, text=label_text, corner_radius=self.cget("corner_radius"),
+                                  fg_color=ctk.ThemeManager.theme["CTkScrollableFrame"]["label_fg_color"])
+        self.label.grid(row=0, column=0, columnspan=2, sticky="ew", padx=self.cget("border_width"))
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self.body.grid(row=1, column=0, sticky="nsew", padx=(6, 0), pady=6)
+        self.body.bind("<Configure>", lambda e: self.relayout())
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns", padx=2, pady=6)
+
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text, text_color="gray50")
+
+        self.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-4>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-5>", self._on_mousewheel, add="+")
+
+    def configure(self, require_redraw=False, **kwargs):
+        if "label_text" in kwargs:
+            self.label.configure(text=kwargs.pop("label_text"))
+        if "empty_text" in kwargs:
+            self.empty_text = kwargs.pop("empty_text")
+            self.empty_label.configure(text=self.empty_text)
+        super().configure(require_redraw=require_redraw, **kwargs)
+
+    def set_items(self, items, keep_scroll=True):
+        self.items = items
+        if not keep_scroll:
+            self.offset = 0
+        if self.focus_index is not None:
+            self.focus_index = min(self.focus_index, len(items) - 1) if items else None
+        # Data changed: every visible slot must be rebound, but nothing is rebuilt
+        for widget in self.pool:
+            widget._bound_index = None
+        self.relayout()
+
+    def set_layout(self, item_factory, row_height, columns=1):
+        self.item_factory = item_factory
+        self.row_height = row_height
+        self.columns = columns
+        self.offset = 0
+        self.rebuild()
+
+    def rebuild(self):
+        # Only needed when the widgets themselves change (card type, theme), costs one viewport
+        for widget in self.pool:
+            widget.destroy()
+        self.pool = []
+        self.relayout()
+
+    def refresh(self):
+        # Rebind visible widgets in place (e.g. after a language change)
+        self.set_items(self.items)
+
+    def visible_widgets(self):
+        return [w for w in self.pool if w._bound_index is not None and w.winfo_ismapped()]
+
+    def _viewport_height(self):
+        return self.body._reverse_widget_scaling(self.body.winfo_height())
+
+    def _content_height(self):
+        rows = math.ceil(len(self.items) / self.columns)
+        return rows * self.row_height
+
+    def _ensure_pool(self, viewport_height):
+        rows = math.ceil(viewport_height / self.row_height) + 1 + self.overscan
+        needed = min(rows * self.columns, len(self.items))
+        while len(self.pool) < needed:
+            widget = self.item_factory(self.body)
+            widget._bound_index = None
+            self.pool.append(widget)
+        # Slots are assigned by index modulo pool size, so growing the pool invalidates them
+        return needed
+
+    def relayout(self):
+        viewport = self._viewport_height()
+        if viewport <= 1:
+            return
+
+        if not self.items:
+            for widget in self.pool:
+                widget.place_forget()
+                widget._bound_index = None
+            self.empty_label.place(relx=0.5, y=50, anchor="n")
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.empty_label.place_forget()
+
+        content = self._content_height()
+        self.offset = max(0, min(self.offset, content - viewport))
+
+        old_size = len(self.pool)
+        self._ensure_pool(viewport)
+        if len(self.pool) != old_size:
+            for widget in self.pool:
+                widget._bound_index = None
+
+        pool_size = len(self.pool)
+        first_row = max(0, int(self.offset // self.row_height) - self.overscan // 2)
+        first = first_row * self.columns
+        last = min(len(self.items), first + pool_size)
+
+        shown = set()
+        for index in range(first, last):
+            widget = self.pool[index % pool_size]
+            if widget._bound_index != index:
+                widget.set_data(self.items[index])
+                widget._bound_index = index
+                if hasattr(widget, "set_focused"):
+                    widget.set_focused(index == self.focus_index)
+            row, col = divmod(index, self.columns)
+            widget.place(relx=col / self.columns, relwidth=1 / self.columns,
+                         y=row * self.row_height - self.offset)
+            shown.add(id(widget))
+
+        for widget in self.pool:
+            if id(widget) not in shown:
+                widget.place_forget()
+
+        if content > 0:
+            self.scrollbar.set(self.offset / content, min(1.0, (self.offset + viewport) / content))
+
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.relayout()
+
+    def scroll_into_view(self, index):
+        top = (index // self.columns) * self.row_height
+        viewport = self._viewport_height()
+        if top < self.offset:
+            self.scroll_to(top)
+        elif top + self.row_height > self.offset + viewport:
+            self.scroll_to(top + self.row_height - viewport)
+
+    def _widget_for(self, index):
+        # Item i can only ever be bound to slot i % pool size
+        if index is None or not self.pool:
+            return None
+        widget = self.pool[index % len(self.pool)]
+        return widget if widget._bound_index == index else None
+
+    def set_focus(self, index):
+        if not self.items:
+            return
+        index = max(0, min(index, len(self.items) - 1))
+        previous = self.focus_index
+        self.focus_index = index
+        self.scroll_into_view(index)
+        # Only the card losing and the card gaining focus are touched
+        for i, focused in ((previous, False), (index, True)):
+            widget = self._widget_for(i)
+            if widget is not None and hasattr(widget, "set_focused"):
+                widget.set_focused(focused)
+
+    def move_focus(self, direction, page=False):
+        """Moves the focus UP/DOWN/LEFT/RIGHT; page jumps a screenful of rows instead of one."""
+        if not self.items:
+            return
+        if self.focus_index is None:
+            # First move focuses the top visible item
+            self.set_focus(math.ceil(self.offset / self.row_height) * self.columns)
+            return
+        rows = max(1, int(self._viewport_height() // self.row_height)) if page else 1
+        if direction == "UP":
+            step = -rows * self.columns
+        elif direction == "DOWN":
+            step = rows * self.columns
+        elif direction == "LEFT" and self.columns > 1:
+            step = -1
+        elif direction == "RIGHT" and self.columns > 1:
+            step = 1
+        else:
+            return
+        self.set_focus(self.focus_index + step)
+
+    def focused_item(self):
+        if self.focus_index is None or self.focus_index >= len(self.items):
+            return None
+        return self.items[self.focus_index]
+
+    def _on_scrollbar(self, action, *args):
+        content = self._content_height()
+        if action == "moveto":
+            self.scroll_to(float(args[0]) * content)
+        elif action == "scroll":
+            amount = int(args[0])
+            step = self._viewport_height() if args[1] == "pages" else self.row_height / 2
+            self.scroll_to(self.offset + amount * step)
+
+    def _contains(self, widget):
+        while widget is not None:
+            if widget is self:
+                return True
+            widget = getattr(widget, "master", None)
+        return False
+
+    def _on_mousewheel(self, event):
+        if not self._contains(event.widget):
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        elif sys.platform == "darwin":
+            delta = -event.delta
+        else:
+            delta = -event.delta / 120
+        self.scroll_to(self.offset + delta * self.row_height / 2)
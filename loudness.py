@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from storage import atomic_write_json
+
+CACHE_VERSION = 2 # 2: K-weighted
+
+# Gating as in EBU R128 / ITU-R BS.1770: 400ms blocks every 100ms,
+# absolute gate at -70, relative gate 10 LU below the mean of the blocks above it
+BLOCK_SECONDS = 0.4
+BLOCK_HOP = 4
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+# K-weighting (BS.1770): a high shelf (+4dB above ~1.7kHz) modelling the head, then a ~38Hz high-pass,
+# as (center Hz, Q, gain dB). The biquads are designed for the track's sample rate and
+# applied in the frequency domain, as an FFT convolution with their impulse response.
+K_SHELF = (1681.974450955533, 0.7071752369554196, 3.999843853973347)
+K_HIGH_PASS = (38.13547087602444, 0.5003270373238773)
+K_TAPS = 4096 # The impulse response has decayed below 1e-8 by then
+FFT_SIZE = 1 << 16
+
+# Files are identified by their size and these many bytes from each end
+FINGERPRINT_BYTES = 64 * 1024
+
+def fingerprint(path, size):
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES:
+            f.seek(-FINGERPRINT_BYTES, os.SEEK_END)
+            digest.update(f.read(FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+def k_weighting(sample_rate, taps=K_TAPS):
+    """Impulse response of the K-weighting filter at sample_rate, truncated to taps."""
+    import numpy as np
+    # Shelf and high-pass biquads through the bilinear transform, as derived by Brecht De Man;
+    # at 48kHz they give the coefficients printed in BS.1770
+    center, q, gain = K_SHELF
+    k = np.tan(np.pi * center / sample_rate)
+    high = 10 ** (gain / 20)
+    band = high ** 0.4996667741545416
+    shelf_b = [high + band * k / q + k * k, 2 * (k * k - high), high - band * k / q + k * k]
+    shelf_a = [1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k]
+
+    center, q = K_HIGH_PASS
+    k = np.tan(np.pi * center / sample_rate)
+    # Only the denominator is normalized here, BS.1770 keeps the numerator at [1, -2, 1]
+    high_pass_b = [1, -2, 1]
+    high_pass_a = [1, 2 * (k * k - 1) / (1 + k / q + k * k), (1 - k / q + k * k) / (1 + k / q + k * k)]
+
+    # rfft of the coefficients is the transfer function at the bins, so the ratio is the filter's response
+    size = taps * 4
+    response = (np.fft.rfft(shelf_b, size) / np.fft.rfft(shelf_a, size)
+                * np.fft.rfft(high_pass_b, size) / np.fft.rfft(high_pass_a, size))
+    return np.fft.irfft(response, size)[:taps]
+
+def weighted_power(samples, sample_rate, full_scale=32768):
+    """K-weighted power of every frame, summed over channels, relative to full scale."""
+    import numpy as np
+    h = k_weighting(sample_rate)
+    response = np.fft.rfft(h, FFT_SIZE)
+    step = FFT_SIZE - len(h) + 1
+    power = np.zeros(len(samples))
+    for channel in samples.T:
+        # Overlap-add, the tail of each segment carries into the next one
+        carry = np.zeros(len(h) - 1)
+        for start in range(0, len(channel), step):
+            segment = channel[start:start + step].astype(np.float64) / full_scale
+            filtered = np.fft.irfft(np.fft.rfft(segment, FFT_SIZE) * response, FFT_SIZE)[:len(segment) + len(h) - 1]
+            filtered[:len(carry)] += carry
+            power[start:start + len(segment)] += np.square(filtered[:len(segment)])
+            carry = filtered[len(segment):]
+    return power
+
+def measure(samples, sample_rate, full_scale=32768):
+    """
+    Integrated loudness (LUFS: K-weighted and gated as in BS.1770) and sample peak (0-1)
+    of integer PCM samples, shaped (frames,) or (frames, channels). Returns (None, peak) for silence.
+    """
+    import numpy as np
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if not len(samples):
+        return None, 0.0
+    peak = max(int(samples.max()), -int(samples.min())) / full_scale
+
+    # Mean square of every block from a running sum of the per-frame power
+    power = weighted_power(samples, sample_rate, full_scale)
+    block = min(len(power), int(sample_rate * BLOCK_SECONDS))
+    hop = max(1, block // BLOCK_HOP)
+    running = np.concatenate(([0.0], np.cumsum(power)))
+    starts = np.arange(0, len(power) - block + 1, hop)
+    blocks = (running[starts + block] - running[starts]) / block
+
+    with np.errstate(divide="ignore"):
+        levels = -0.691 + 10 * np.log10(blocks)
+    gated = blocks[levels > ABSOLUTE_GATE]
+    if not len(gated):
+        return None, peak
+    threshold = -0.691 + 10 * np.log10(gated.mean()) + RELATIVE_GATE
+    gated = blocks[(levels > ABSOLUTE_GATE) & (levels > threshold)]
+    return float(-0.691 + 10 * np.log10(gated.mean())), peak
+
+def _init_worker():
+    # Worker processes only decode, they never open an audio device
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    if hasattr(os, "nice"):
+        os.nice(10)
+    import pygame
+    pygame.mixer.init(frequency=48000, size=-16, channels=2)
+
+def measure_file(path):
+    """Runs in a worker process: decodes the whole track and measures it."""
+    import pygame
+    samples = pygame.sndarray.array(pygame.mixer.Sound(path))
+    return measure(samples, pygame.mixer.get_init()[0])
+
+class LoudnessAnalyzer:
+    """
+    Measures the loudness of music tracks in a pool of worker processes, in the
+    background, and turns it into a per-track volume that brings every track down
+    to target (LUFS). Results are cached by file fingerprint and saved as they
+    arrive, so an interrupted analysis picks up where it stopped.
+    """
+    def __init__(self, cache_file="loudness.json", persister=None, target=-18.0, max_workers=2):
+        self.cache_file = cache_file
+        self.persister = persister
+        self.target = target
+        self.max_workers = max_workers
+        self.tracks = {} # fingerprint -> [loudness, peak]
+        self.files = {} # path -> [size, mtime_ns, fingerprint]
+        self.load()
+
+        self.requests = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.analyzed = 0
+
+    def load(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.tracks = data["tracks"]
+                self.files = data["files"]
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+
+    def save(self):
+        data = {"version": CACHE_VERSION, "tracks": dict(self.tracks), "files": dict(self.files)}
+        if self.persister:
+            self.persister.submit(self.cache_file, self._write, data)
+        else:
+            self._write(data)
+
+    def _write(self, data):
+        atomic_write_json(self.cache_file, data)
+
+    def _fingerprint(self, path):
+        # Cached by size and mtime, so known files aren't read again
+        stat = os.stat(path)
+        entry = self.files.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        key = fingerprint(path, stat.st_size)
+        self.files[path] = [stat.st_size, stat.st_mtime_ns, key]
+        return key
+
+    def gain(self, path):
+        """Volume (0-1) for the track, 1.0 until it has been measured. Tracks are never boosted."""
+        entry = self.files.get(path)
+        if entry is None:
+            return 1.0
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 1.0
+        if entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            return 1.0
+        result = self.tracks.get(entry[2])
+        if not result or result[0] is None:
+            return 1.0
+        return min(1.0, 10 ** ((self.target - result[0]) / 20))
+
+    def analyze(self, paths):
+        """Queues tracks for analysis and returns immediately. Tracks already measured are skipped."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        self.requests.put(list(paths))
+
+    def stop(self):
+        self.cancel_event.set()
+        self.requests.put(None)
+
+    def _run(self):
+        while not self.cancel_event.is_set():
+            paths = self.requests.get()
+            if paths is None:
+                return
+            jobs = {} # path -> fingerprint
+            queued = set()
+            for path in paths:
+                if self.cancel_event.is_set():
+                    return
+                try:
+                    key = self._fingerprint(path)
+                except OSError:
+                    continue
+                if key not in self.tracks and key not in queued:
+                    jobs[path] = key
+                    queued.add(key)
+            if jobs:
+                self._measure(jobs)
+
+    def _measure(self, jobs):
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(measure_file, path): path for path in jobs}
+            for future in as_completed(futures):
+                if self.cancel_event.is_set():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+                path = futures[future]
+                try:
+                    loudness, peak = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (not the track's fault), these are retried next time
+                    print(f"Loudness analysis stopped: {e}")
+                    break
+                except Exception as e:
+                    # Remembered as unmeasurable until the file changes
+                    print(f"Error measuring loudness of {path}: {e}")
+                    loudness, peak = None, None
+                self.tracks[jobs[path]] = [loudness, peak]
+                self.analyzed += 1
+                # Saved per track, coalesced by the persister
+                self.save()
@@ -1,42 +1,203 @@
-import urllib.request
+import http.client
 import json
+import sqlite3
+import threading
+import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+STEAM_HOST = "store.steampowered.com"
+
+DAY = 24 * 60 * 60
+
+class RateLimiter:
+    """Token bucket shared by every worker of a client."""
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class ResponseCache:
+    """
+    On-disk cache of decoded API responses keyed by request path.
+    None is cached too (negative caching), with its own, shorter TTL.
+    """
+    def __init__(self, path, ttl=7 * DAY, negative_ttl=DAY):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, fetched REAL NOT NULL, data TEXT)")
+
+    def get(self, key):
+        """Returns (hit, value)."""
+        with self.lock:
+            row = self.conn.execute("SELECT fetched, data FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        fetched, data = row
+        ttl = self.ttl if data is not None else self.negative_ttl
+        if time.time() - fetched > ttl:
+            return False, None
+        return True, json.loads(data) if data is not None else None
+
+    def put(self, key, value):
+        data = json.dumps(value) if value is not None else None
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO responses (key, fetched, data) VALUES (?, ?, ?)", (key, time.time(), data))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class MetadataClient:
+    """
+    Steam Store metadata client: one keep-alive connection per worker thread,
+    retries with backoff, a shared rate limit and an on-disk response cache.
+    """
+    def __init__(self, host=STEAM_HOST, port=None, https=True, cache_file="metadata_cache.db",
+                 timeout=10, retries=2, backoff=0.5, rate=4, max_workers=4):
+        self.host = host
+        self.port = port
+        self.https = https
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff # Seconds before the first retry, doubled for each one after it
+        self.limiter = RateLimiter(rate, burst=max_workers)
+        self.cache = ResponseCache(cache_file) if cache_file else None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="metadata")
+        self.local = threading.local()
+
+        # Counters
+        self.requests = 0
+        self.cache_hits = 0
+        self.connections = 0
+
+    def _connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = conn_class(self.host, self.port, timeout=self.timeout)
+            self.local.conn = conn
+            self.connections += 1
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def get_json(self, path):
+        """GET path and decode it as JSON, going through the cache. Raises on network failure."""
+        if self.cache:
+            hit, value = self.cache.get(path)
+            if hit:
+                self.cache_hits += 1
+                return value
+
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                conn = self._connection()
+                conn.request("GET", path, headers={"Connection": "keep-alive", "Accept": "application/json"})
+                response = conn.getresponse()
+                body = response.read()
+                self.requests += 1
+                if response.status == 429 or response.status >= 500:
+                    raise http.client.HTTPException(f"HTTP {response.status}")
+                if response.will_close:
+                    self._drop_connection()
+                value = json.loads(body.decode()) if response.status == 200 and body else None
+                break
+            except (http.client.HTTPException, OSError):
+                # Stale keep-alive sockets fail here too, a fresh connection usually fixes it
+                self._drop_connection()
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+        if self.cache:
+            self.cache.put(path, value)
+        return value
+
+    def fetch(self, game_name):
+        """
+        Fetches game metadata (description, image, genres) from the Steam Store API.
+        """
+        query = urllib.parse.quote(game_name.strip().lower())
+        data = self.get_json(f"/api/storesearch/?term={query}&l=english&cc=US")
+        if not data or data.get("total", 0) == 0 or not data.get("items"):
+            return None
+
+        app_id = data["items"][0]["id"]
+        details_data = self.get_json(f"/api/appdetails?appids={app_id}")
+        if not details_data or str(app_id) not in details_data or not details_data[str(app_id)]["success"]:
+            return None
+
+        game_info = details_data[str(app_id)]["data"]
+        genres = []
+        if "genres" in game_info:
+            genres = [g["description"] for g in game_info["genres"]]
+
+        return {
+            "description": game_info.get("short_description", ""),
+            "image_url": game_info.get("header_image", ""),
+            "genres": genres
+        }
+
+    def submit(self, game_name):
+        """Fetches on the client's pool, returns a Future."""
+        return self.executor.submit(self.fetch, game_name)
+
+    def fetch_many(self, game_names):
+        """Fetches many titles concurrently (within the rate limit), returns {name: metadata or None}."""
+        futures = {name: self.submit(name) for name in game_names}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"Error fetching metadata for {name}: {e}")
+                results[name] = None
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache:
+            self.cache.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MetadataClient()
+        return _client
 
 def fetch_metadata(game_name):
     """
     Fetches game metadata (description, image) from Steam Store API.
     """
     try:
-        # Search for the game
-        query = urllib.parse.quote(game_name)
-        url = f"http://store.steampowered.com/api/storesearch/?term={query}&l=english&cc=US"
-        
-        with urllib.request.urlopen(url) as response:
-            data = json.loads(response.read().decode())
-            
-        if data and data.get("total", 0) > 0:
-            item = data["items"][0]
-            app_id = item["id"]
-            
-            # Get details for the specific app
-            details_url = f"http://store.steampowered.com/api/appdetails?appids={app_id}"
-            with urllib.request.urlopen(details_url) as response:
-                details_data = json.loads(response.read().decode())
-                
-            if details_data and str(app_id) in details_data and details_data[str(app_id)]["success"]:
-                game_info = details_data[str(app_id)]["data"]
-                
-                genres = []
-                if "genres" in game_info:
-                    genres = [g["description"] for g in game_info["genres"]]
-                    
-                return {
-                    "description": game_info.get("short_description", ""),
-                    "image_url": game_info.get("header_image", ""),
-                    "genres": genres
-                }
-                
-        return None
+        return get_client().fetch(game_name)
     except Exception as e:
         print(f"Error fetching metadata: {e}")
         return None
@@ -0,0 +1,361 @@
+import json
+import os
+import struct
+from library_scanner import BoundedScanner
+from storage import atomic_write_json
+
+AUDIO_EXTENSIONS = (".wav", ".ogg", ".mp3")
+
+INDEX_VERSION = 1
+
+# Only the start (and end) of a file is read, tags and stream headers live there
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 64 * 1024
+
+# Layer III bitrates in kbps by bitrate index, for MPEG-1 and MPEG-2/2.5
+MP3_BITRATES = {
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+}
+# Sample rates by the header's version bits: 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+ID3_FRAMES = {b"TIT2": "title", b"TT2": "title", b"TPE1": "artist", b"TP1": "artist", b"TLEN": "length"}
+ID3_ENCODINGS = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+class TagFormatError(Exception):
+    pass
+
+def _text(raw):
+    raw = raw.split(b"\0")[0]
+    try:
+        return raw.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        return raw.decode("latin-1").strip()
+
+def read_wav(f, size):
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise TagFormatError("Not a RIFF/WAVE file")
+    tags = {"title": None, "artist": None, "duration": None}
+    byte_rate = data_size = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            break
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+        if chunk_id == b"fmt ":
+            fmt = f.read(chunk_size)
+            if len(fmt) >= 12:
+                byte_rate = struct.unpack_from("<I", fmt, 8)[0]
+        elif chunk_id == b"data":
+            # Streams written without a final size have 0 or 0xFFFFFFFF here
+            data_size = min(chunk_size, size - f.tell()) or size - f.tell()
+            f.seek(chunk_size, 1)
+        elif chunk_id == b"LIST":
+            data = f.read(chunk_size)
+            if data[:4] == b"INFO":
+                pos = 4
+                while pos + 8 <= len(data):
+                    sub_id, sub_size = struct.unpack_from("<4sI", data, pos)
+                    if sub_id == b"INAM":
+                        tags["title"] = _text(data[pos + 8:pos + 8 + sub_size]) or None
+                    elif sub_id == b"IART":
+                        tags["artist"] = _text(data[pos + 8:pos + 8 + sub_size]) or None
+                    pos += 8 + sub_size + (sub_size & 1)
+        else:
+            f.seek(chunk_size, 1)
+        # Chunks are word aligned
+        if chunk_size & 1:
+            f.seek(1, 1)
+    if byte_rate and data_size:
+        tags["duration"] = data_size / byte_rate
+    return tags
+
+def _ogg_packets(data):
+    """Yields the packets of the Ogg pages in data, in order. The last one may be truncated."""
+    packet = b""
+    pos = 0
+    while True:
+        pos = data.find(b"OggS", pos)
+        if pos < 0 or pos + 27 > len(data):
+            return
+        segments = data[pos + 26]
+        body = pos + 27 + segments
+        for lace in data[pos + 27:body]:
+            packet += data[body:body + lace]
+            body += lace
+            if lace < 255:
+                yield packet
+                packet = b""
+        pos = body
+
+def _vorbis_comments(packet, offset):
+    comments = {}
+    try:
+        vendor_length = struct.unpack_from("<I", packet, offset)[0]
+        pos = offset + 4 + vendor_length
+        count = struct.unpack_from("<I", packet, pos)[0]
+        pos += 4
+        for _ in range(count):
+            length = struct.unpack_from("<I", packet, pos)[0]
+            key, _, value = packet[pos + 4:pos + 4 + length].decode("utf-8", "replace").partition("=")
+            comments.setdefault(key.upper(), value.strip())
+            pos += 4 + length
+    except struct.error:
+        # Cut off by the end of HEAD_BYTES (e.g. embedded cover art), keep what was read
+        pass
+    return comments
+
+def read_ogg(f, size):
+    head = f.read(HEAD_BYTES)
+    if head[:4] != b"OggS":
+        raise TagFormatError("Not an Ogg file")
+    rate = None
+    pre_skip = 0
+    comments = {}
+    for packet in _ogg_packets(head):
+        if packet.startswith(b"\x01vorbis") and len(packet) >= 16:
+            rate = struct.unpack_from("<I", packet, 12)[0]
+        elif packet.startswith(b"OpusHead") and len(packet) >= 12:
+            # Opus granule positions always count 48kHz samples
+            rate = 48000
+            pre_skip = struct.unpack_from("<H", packet, 10)[0]
+        elif packet.startswith(b"\x03vorbis"):
+            comments = _vorbis_comments(packet, 7)
+            break
+        elif packet.startswith(b"OpusTags"):
+            comments = _vorbis_comments(packet, 8)
+            break
+
+    # Duration is the granule position of the last page
+    duration = None
+    if rate:
+        f.seek(max(0, size - TAIL_BYTES))
+        tail = f.read(TAIL_BYTES)
+        pos = tail.rfind(b"OggS")
+        while pos >= 0:
+            if pos + 14 <= len(tail):
+                granule = struct.unpack_from("<q", tail, pos + 6)[0]
+                if granule >= 0:
+                    duration = max(0, granule - pre_skip) / rate
+                    break
+            pos = tail.rfind(b"OggS", 0, pos)
+    return {"title": comments.get("TITLE") or None, "artist": comments.get("ARTIST") or None, "duration": duration}
+
+def _syncsafe(raw):
+    return (raw[0] << 21) | (raw[1] << 14) | (raw[2] << 7) | raw[3]
+
+def _id3v2_frames(data, version, flags):
+    if flags & 0x80 and version < 4:
+        # Whole-tag unsynchronisation (2.4 marks it per frame)
+        data = data.replace(b"\xff\x00", b"\xff")
+    pos = 0
+    if flags & 0x40 and len(data) >= 4:
+        # Skip the extended header
+        pos = _syncsafe(data[:4]) if version == 4 else struct.unpack(">I", data[:4])[0] + 4
+    id_length, header_length = (3, 6) if version == 2 else (4, 10)
+    frames = {}
+    while pos + header_length <= len(data):
+        frame_id = data[pos:pos + id_length]
+        if frame_id[0] == 0:
+            break # Padding
+        if version == 2:
+            frame_size = int.from_bytes(data[pos + 3:pos + 6], "big")
+        elif version == 4:
+            frame_size = _syncsafe(data[pos + 4:pos + 8])
+        else:
+            frame_size = struct.unpack_from(">I", data, pos + 4)[0]
+        body = data[pos + header_length:pos + header_length + frame_size]
+        name = ID3_FRAMES.get(frame_id)
+        if name and len(body) > 1 and name not in frames:
+            text = body[1:].decode(ID3_ENCODINGS.get(body[0], "latin-1"), "replace")
+            frames[name] = text.split("\0")[0].strip()
+        pos += header_length + frame_size
+    return frames
+
+def _mp3_frame(data):
+    """Finds the first Layer III frame header in data: (offset, version bits, bitrate index, rate index, mono)."""
+    pos = data.find(b"\xff")
+    while 0 <= pos and pos + 4 <= len(data):
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        version, layer = (b1 >> 3) & 3, (b1 >> 1) & 3
+        bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 3
+        if b1 & 0xE0 == 0xE0 and version != 1 and layer == 1 and 0 < bitrate_index < 15 and rate_index < 3:
+            return pos, version, bitrate_index, rate_index, b3 >> 6 == 3
+        pos = data.find(b"\xff", pos + 1)
+    return None
+
+def read_mp3(f, size):
+    header = f.read(10)
+    frames = {}
+    audio_start = 0
+    if header[:3] == b"ID3" and len(header) == 10:
+        version, flags = header[3], header[5]
+        tag_size = _syncsafe(header[6:10])
+        frames = _id3v2_frames(f.read(tag_size), version, flags)
+        audio_start = 10 + tag_size + (10 if flags & 0x10 else 0)
+
+    # ID3v1, the last 128 bytes
+    audio_end = size
+    if size >= 128:
+        f.seek(size - 128)
+        v1 = f.read(128)
+        if v1[:3] == b"TAG":
+            audio_end -= 128
+            frames.setdefault("title", _text(v1[3:33]))
+            frames.setdefault("artist", _text(v1[33:63]))
+
+    f.seek(audio_start)
+    data = f.read(HEAD_BYTES)
+    frame = _mp3_frame(data)
+    if frame is None and not frames:
+        raise TagFormatError("No MPEG audio frame found")
+
+    duration = None
+    if frame:
+        pos, version, bitrate_index, rate_index, mono = frame
+        mpeg1 = version == 3
+        rate = MP3_SAMPLE_RATES[version][rate_index]
+        samples_per_frame = 1152 if mpeg1 else 576
+        # VBR files carry a frame count in a Xing/Info or VBRI header inside the first frame
+        xing = pos + 4 + ((17 if mono else 32) if mpeg1 else (9 if mono else 17))
+        frame_count = None
+        if data[xing:xing + 4] in (b"Xing", b"Info") and len(data) >= xing + 12:
+            if struct.unpack_from(">I", data, xing + 4)[0] & 1:
+                frame_count = struct.unpack_from(">I", data, xing + 8)[0]
+        elif data[pos + 36:pos + 40] == b"VBRI" and len(data) >= pos + 54:
+            frame_count = struct.unpack_from(">I", data, pos + 50)[0]
+        if frame_count:
+            duration = frame_count * samples_per_frame / rate
+        elif frames.get("length", "").isdigit():
+            duration = int(frames["length"]) / 1000
+        else:
+            # Constant bitrate
+            duration = (audio_end - audio_start - pos) * 8 / (MP3_BITRATES[mpeg1][bitrate_index] * 1000)
+    elif frames.get("length", "").isdigit():
+        duration = int(frames["length"]) / 1000
+    return {"title": frames.get("title") or None, "artist": frames.get("artist") or None, "duration": duration}
+
+READERS = {".wav": read_wav, ".ogg": read_ogg, ".mp3": read_mp3}
+
+def read_tags(path):
+    """Returns {"title", "artist", "duration"} from the file's headers; any of them may be None."""
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise TagFormatError(f"Unsupported audio file {path}")
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        return reader(f, size)
+
+def format_duration(seconds):
+    if seconds is None:
+        return ""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}:{seconds:02d}"
+
+def find_audio(roots, cancel_event=None):
+    """Yields audio files under roots (files in roots are yielded if they are audio)."""
+    for root in roots:
+        if os.path.isfile(root):
+            if root.lower().endswith(AUDIO_EXTENSIONS):
+                yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith(AUDIO_EXTENSIONS):
+                    yield os.path.join(dirpath, filename)
+
+class MusicLibrary:
+    """
+    Title, artist and duration of known tracks, kept in a compact index:
+    path -> [size, mtime_ns, title, artist, duration]. An entry is only valid while
+    the file's size and mtime match, so rescans skip every file that hasn't changed.
+    """
+    def __init__(self, index_file="music_index.json", persister=None):
+        self.index_file = index_file
+        self.persister = persister
+        self.tracks = self.load()
+
+    def load(self):
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data["tracks"]
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+        return {}
+
+    def save(self):
+        data = {"version": INDEX_VERSION, "tracks": dict(self.tracks)}
+        if self.persister:
+            self.persister.submit(self.index_file, self._write, data)
+        else:
+            self._write(data)
+
+    def _write(self, data):
+        atomic_write_json(self.index_file, data)
+
+    def is_current(self, path, stat):
+        entry = self.tracks.get(path)
+        return entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns
+
+    def put(self, path, entry):
+        self.tracks[path] = entry
+
+    def info(self, path):
+        """The track's title (the file name if it has none), artist and duration."""
+        entry = self.tracks.get(path)
+        title = entry[2] if entry and entry[2] else os.path.splitext(os.path.basename(path))[0]
+        return {"path": path, "title": title, "artist": entry[3] if entry else None,
+                "duration": entry[4] if entry else None}
+
+class MusicScanner(BoundedScanner):
+    """
+    Indexes audio files under a set of roots on a bounded worker pool. Files whose
+    size and mtime match the index are not opened. Results are queued for the Tk
+    thread, which applies them to the library with poll().
+    """
+    DONE_EVENTS = ("indexed", "cached", "failed")
+
+    def __init__(self, library, max_workers=4):
+        super().__init__(self._jobs, self._work, max_workers)
+        self.library = library
+
+    def _jobs(self, roots):
+        for path in find_audio(roots, self.cancel_event):
+            self.found += 1
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                self.events.put(("failed", (path, str(e))))
+                continue
+            if self.library.is_current(path, stat):
+                self.events.put(("cached", path))
+                continue
+            yield (path, stat)
+
+    def _work(self, path, stat):
+        try:
+            tags = read_tags(path)
+        except Exception as e:
+            # Still indexed, so an unreadable file isn't parsed again until it changes
+            print(f"Could not read tags of {path}: {e}")
+            tags = {"title": None, "artist": None, "duration": None}
+        entry = [stat.st_size, stat.st_mtime_ns, tags["title"], tags["artist"], tags["duration"]]
+        self.events.put(("indexed", (path, entry)))
+
+    def poll(self, max_events=200):
+        """Applies up to max_events results to the library without blocking, for the Tk thread. Returns them."""
+        events = super().poll(max_events)
+        indexed = [data for kind, data in events if kind == "indexed"]
+        for path, entry in indexed:
+            self.library.put(path, entry)
+        if indexed:
+            self.library.save()
+        return events
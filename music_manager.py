@@ -1,16 +1,53 @@
-import pygame
 import os
 import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from storage import atomic_write_json
+
+REPEAT_MODES = ("off", "all", "one")
+
+# Gapless mode: the next track is queued on the channel this long before the current one ends
+QUEUE_LEAD = 0.5
+
+# Fade used when the user skips or picks a track
+SKIP_FADE_MS = 300
 
 class MusicManager:
-    def __init__(self, settings_file="music.json"):
+    """
+    Background music. Playback runs on an engine thread fed by a command queue, so the
+    Tk thread never waits on decoding. Tracks are decoded into Sounds and played on two
+    channels of their own: the next track is decoded ahead of time and either crossfaded
+    in (crossfade seconds) or queued on the same channel for a gapless transition (0).
+    """
+    def __init__(self, settings_file="music.json", persister=None, crossfade=2.0, loudness=None):
         self.settings_file = settings_file
+        self.persister = persister
+        self.loudness = loudness # LoudnessAnalyzer, sets each track's volume once it has been measured
         self.playlist = self.load_playlist()
         self.current_index = 0
         self.is_playing = False
-        
-        pygame.mixer.init()
-        pygame.mixer.music.set_endevent(pygame.USEREVENT)
+        self.mixer_ready = False
+
+        self.crossfade = crossfade
+        self.shuffle = False
+        self.repeat = "all"
+        self.order = None # Shuffled play order, rebuilt when needed
+
+        self.commands = queue.Queue()
+        self.thread = None
+        self.decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="music-decode")
+
+    def init_mixer(self):
+        # The mixer is started on first playback, not when the launcher boots
+        import pygame
+        if not self.mixer_ready:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self.mixer_ready = True
+        return pygame
 
     def load_playlist(self):
         if os.path.exists(self.settings_file):
@@ -22,44 +59,306 @@ class MusicManager:
         return []
 
     def save_playlist(self):
-        with open(self.settings_file, "w") as f:
-            json.dump(self.playlist, f)
+        if self.persister:
+            self.persister.submit(self.settings_file, self._write_playlist, list(self.playlist))
+        else:
+            self._write_playlist(self.playlist)
+
+    def _write_playlist(self, playlist):
+        atomic_write_json(self.settings_file, playlist)
 
     def add_music(self, path):
         if path not in self.playlist and os.path.exists(path):
             self.playlist.append(path)
             self.save_playlist()
+            if self.loudness:
+                self.loudness.analyze([path])
             return True
         return False
 
+    def add_tracks(self, paths):
+        # Folder import: one save for the whole batch
+        added = [p for p in dict.fromkeys(paths) if p not in self.playlist and os.path.exists(p)]
+        if added:
+            self.playlist.extend(added)
+            self.save_playlist()
+            if self.loudness:
+                self.loudness.analyze(added)
+        return len(added)
+
+    # Controls, safe to call from the Tk thread: they only queue a command
+
+    def _send(self, *command):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        self.commands.put(command)
+
     def play(self, index=None):
-        if not self.playlist:
-            return
+        if self.playlist:
+            self._send("play", index)
+
+    def pause(self):
+        # Toggles between pause and play
+        if self.thread is not None:
+            self._send("toggle")
 
-        if index is not None:
-            self.current_index = index
-        
-        if 0 <= self.current_index < len(self.playlist):
+    def next_track(self):
+        if self.playlist:
+            self._send("next")
+
+    def stop(self):
+        if self.thread is not None:
+            self._send("stop")
+
+    def close(self):
+        if self.thread is not None:
+            self._send("quit")
+        self.decoder.shutdown(wait=False, cancel_futures=True)
+
+    def set_shuffle(self, shuffle):
+        self.shuffle = shuffle
+        self._send_modes()
+
+    def set_repeat(self, mode):
+        if mode in REPEAT_MODES:
+            self.repeat = mode
+            self._send_modes()
+
+    def _send_modes(self):
+        # shuffle and repeat are what the UI shows, the engine only picks them up from its queue
+        if self.thread is not None:
+            self._send("modes", self.shuffle, self.repeat)
+
+    def get_playlist(self):
+        return [os.path.basename(p) for p in self.playlist]
+
+    # Engine thread
+
+    def _run(self):
+        pygame = self.init_mixer()
+        # Two channels of our own, added after the existing ones
+        first = pygame.mixer.get_num_channels()
+        pygame.mixer.set_num_channels(first + 2)
+        self.channels = [pygame.mixer.Channel(first), pygame.mixer.Channel(first + 1)]
+        self.active = 0
+        self.play_shuffle, self.play_repeat = self.shuffle, self.repeat
+        self.current = None # {"index", "sound", "started", "length", "paused_at", "queued"}
+        self.pending = None # (index, Future of the decoded Sound)
+
+        while True:
+            deadline = self._deadline()
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
             try:
-                pygame.mixer.music.load(self.playlist[self.current_index])
-                pygame.mixer.music.play()
-                self.is_playing = True
+                command = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                command = None
+            if command and command[0] == "quit":
+                for channel in self.channels:
+                    channel.stop()
+                return
+            try:
+                if command:
+                    self._command(*command)
+                self._advance()
             except Exception as e:
                 print(f"Error playing music: {e}")
 
-    def pause(self):
-        if self.is_playing:
-            pygame.mixer.music.pause()
-            self.is_playing = False
+    def _load(self, path):
+        import pygame
+        sound = pygame.mixer.Sound(path)
+        if self.loudness:
+            sound.set_volume(self.loudness.gain(path))
+        return sound
+
+    def _following(self, index, manual=False):
+        """Index of the track after index, or None when playback should stop."""
+        count = len(self.playlist)
+        if count == 0:
+            return None
+        if self.play_repeat == "one" and not manual:
+            return index
+        if self.play_shuffle:
+            if self.order is None or len(self.order) != count:
+                self.order = random.sample(range(count), count)
+            position = self.order.index(index) if index in self.order else -1
+            if position + 1 < count:
+                return self.order[position + 1]
+            if self.play_repeat == "off" and not manual:
+                return None
+            self.order = random.sample(range(count), count)
+            return self.order[0]
+        if index + 1 < count:
+            return index + 1
+        return 0 if self.play_repeat != "off" or manual else None
+
+    def _prefetch(self):
+        index = self._following(self.current["index"])
+        if self.pending is not None and self.pending[1] is not None and self.pending[0] == index:
+            # Already decoding the right track
+            return
+        if index is None:
+            self.pending = None
+        elif index == self.current["index"]:
+            # Repeat one: the decoded track is reused as is
+            self.pending = (index, None)
         else:
-            pygame.mixer.music.unpause()
-            self.is_playing = True
+            self.pending = (index, self.decoder.submit(self._load, self.playlist[index]))
 
-    def next_track(self):
-        if not self.playlist:
+    def _take_pending(self, index=None):
+        if self.pending is None or (index is not None and self.pending[0] != index):
+            return None
+        pending_index, future = self.pending
+        self.pending = None
+        if future is None:
+            return pending_index, self.current["sound"]
+        try:
+            return pending_index, future.result()
+        except Exception as e:
+            print(f"Error loading music {self.playlist[pending_index]}: {e}")
+            return None
+
+    def _release(self, channel, fade_ms):
+        # Channel.queue has no undo: a track queued for a gapless transition would start once
+        # the fade ends, on a channel the engine no longer follows, so that channel is cut instead
+        if self.current and self.current["queued"] and channel is self.channels[self.active]:
+            channel.stop()
+        else:
+            channel.fadeout(fade_ms)
+
+    def _fade(self, track):
+        # Never fade over more than half a track
+        return min(self.crossfade, track["length"] / 2)
+
+    def _start(self, index):
+        if not 0 <= index < len(self.playlist):
             return
-        self.current_index = (self.current_index + 1) % len(self.playlist)
-        self.play()
+        pending = self._take_pending(index)
+        if pending:
+            sound = pending[1]
+        else:
+            try:
+                sound = self._load(self.playlist[index])
+            except Exception as e:
+                print(f"Error loading music {self.playlist[index]}: {e}")
+                return
 
-    def get_playlist(self):
-        return [os.path.basename(p) for p in self.playlist]
+        if self.current:
+            # Cut the old track short with a quick fade on its own channel
+            self._release(self.channels[self.active], SKIP_FADE_MS)
+            self.active = 1 - self.active
+        self.channels[self.active].play(sound)
+        self._set_current(index, sound, time.monotonic())
+
+    def _set_current(self, index, sound, started):
+        self.current = {"index": index, "sound": sound, "started": started, "length": sound.get_length(),
+                        "paused_at": None, "queued": False}
+        self.current_index = index
+        self.is_playing = True
+        self._prefetch()
+
+    def _command(self, name, *args):
+        if name == "play":
+            index = args[0]
+            if index is None:
+                if self.current is None:
+                    self._start(self.current_index)
+                elif self.current["paused_at"] is not None:
+                    self._command("toggle")
+            else:
+                self._start(index)
+
+        elif name == "toggle":
+            if self.current is None:
+                self._start(self.current_index)
+            elif self.current["paused_at"] is None:
+                for channel in self.channels:
+                    channel.pause()
+                self.current["paused_at"] = time.monotonic()
+                self.is_playing = False
+            else:
+                # Shift the schedule by the time spent paused
+                self.current["started"] += time.monotonic() - self.current["paused_at"]
+                self.current["paused_at"] = None
+                for channel in self.channels:
+                    channel.unpause()
+                self.is_playing = True
+
+        elif name == "next":
+            index = self._following(self.current["index"] if self.current else self.current_index, manual=True)
+            if index is not None:
+                self._start(index)
+
+        elif name == "stop":
+            for channel in self.channels:
+                self._release(channel, SKIP_FADE_MS)
+            self.current = None
+            self.pending = None
+            self.is_playing = False
+
+        elif name == "modes":
+            shuffle, repeat = args
+            if shuffle != self.play_shuffle:
+                self.order = None
+            self.play_shuffle, self.play_repeat = shuffle, repeat
+            # The prefetched track was picked under the old modes. A track already queued on the
+            # channel stays, it is about to start anyway.
+            if self.current and not self.current["queued"]:
+                self._prefetch()
+
+    def _deadline(self):
+        track = self.current
+        if track is None or track["paused_at"] is not None:
+            return None
+        end = track["started"] + track["length"]
+        if track["queued"] or self.pending is None:
+            return end
+        if self.crossfade > 0:
+            return end - self._fade(track)
+        return end - QUEUE_LEAD
+
+    def _advance(self):
+        track = self.current
+        if track is None or track["paused_at"] is not None:
+            return
+        now = time.monotonic()
+        end = track["started"] + track["length"]
+
+        if self.pending is None and not track["queued"]:
+            # Last track with repeat off
+            if now >= end:
+                self.current = None
+                self.is_playing = False
+            return
+
+        skipped = self.pending[0] if self.pending else None
+        if self.crossfade > 0:
+            if now < end - self._fade(track):
+                return
+            pending = self._take_pending()
+            if pending is None:
+                return self._advance_after_error(skipped)
+            fade_ms = int(self._fade(track) * 1000)
+            self._release(self.channels[self.active], fade_ms)
+            self.active = 1 - self.active
+            self.channels[self.active].play(pending[1], fade_ms=fade_ms)
+            self._set_current(pending[0], pending[1], now)
+            return
+
+        # Gapless: queue the next track on the same channel, then switch over at the end
+        if not track["queued"] and now >= end - QUEUE_LEAD:
+            pending = self._take_pending()
+            if pending is None:
+                return self._advance_after_error(skipped)
+            self.channels[self.active].queue(pending[1])
+            track["queued"] = pending
+        if track["queued"] and now >= end:
+            self._set_current(*track["queued"], end)
+
+    def _advance_after_error(self, skipped):
+        # The next track couldn't be decoded: prefetch the one after it instead
+        following = self._following(skipped)
+        if following is None or following == self.current["index"]:
+            self.pending = None
+        else:
+            self.pending = (following, self.decoder.submit(self._load, self.playlist[following]))
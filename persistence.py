@@ -0,0 +1,101 @@
+import threading
+import time
+
+class WriteBehindPersister:
+    """
+    Background writer shared by the managers. Writes are submitted under a key;
+    a newer submission for a key that has not been written yet replaces the older one,
+    so a burst of changes costs one write per key once the window elapses.
+    """
+    def __init__(self, window=0.5):
+        self.window = window
+        self.pending = {} # key -> (write_fn, payload), in submission order
+        self.first_dirty = None
+        self.writing = False
+        self.flush_requested = False
+        self.running = True
+        self.cond = threading.Condition()
+
+        # Counters
+        self.submitted = 0
+        self.written = 0
+        self.coalesced = 0
+        self.errors = 0
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, key, write_fn, payload):
+        # payload must be a snapshot, it is handed to write_fn on the writer thread
+        with self.cond:
+            if not self.running:
+                self._write({key: (write_fn, payload)})
+                return
+            if key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = (write_fn, payload)
+            self.submitted += 1
+            if self.first_dirty is None:
+                self.first_dirty = time.monotonic()
+            self.cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                # Let the burst settle unless someone is waiting on flush()
+                deadline = self.first_dirty + self.window
+                while self.running and not self.flush_requested and time.monotonic() < deadline:
+                    self.cond.wait(deadline - time.monotonic())
+                batch = self.pending
+                self.pending = {}
+                self.first_dirty = None
+                self.writing = True
+
+            self._write(batch)
+
+            with self.cond:
+                self.writing = False
+                self.cond.notify_all()
+
+    def _write(self, batch):
+        for key, (write_fn, payload) in batch.items():
+            try:
+                write_fn(payload)
+                self.written += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Error saving {key}: {e}")
+
+    def flush(self, timeout=10):
+        """Blocks until everything submitted so far is on disk."""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            self.flush_requested = True
+            self.cond.notify_all()
+            while (self.pending or self.writing) and self.thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+            self.flush_requested = False
+
+    def stop(self):
+        self.flush()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout=5)
+
+    def stats(self):
+        with self.cond:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "pending": len(self.pending)
+            }
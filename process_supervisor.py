@@ -0,0 +1,80 @@
+import os
+import shlex
+import subprocess
+import threading
+import time
+
+def build_command(exe_path, launch_args=""):
+    if os.name == "nt":
+        # Hand the arguments to the game exactly as typed, Windows programs parse their own command line
+        command = subprocess.list2cmdline([exe_path])
+        return f"{command} {launch_args}" if launch_args.strip() else command
+    return [exe_path] + shlex.split(launch_args)
+
+class GameSupervisor:
+    """
+    Launches games and watches every running one from a single thread.
+    on_exit(path, start_time, end_time, exit_code) is called from that thread when a game quits.
+    """
+    def __init__(self, on_exit, poll_interval=1.0):
+        self.on_exit = on_exit
+        self.poll_interval = poll_interval
+        self.processes = {} # path -> (Popen, start time)
+        self.cond = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._watch, daemon=True)
+        self.thread.start()
+
+    def launch(self, exe_path, launch_args=""):
+        """Starts the game in its own folder. Returns False if it is already running, raises OSError if it can't start."""
+        with self.cond:
+            if exe_path in self.processes:
+                return False
+            process = subprocess.Popen(build_command(exe_path, launch_args), cwd=os.path.dirname(exe_path) or None)
+            self.processes[exe_path] = (process, time.time())
+            self.cond.notify_all()
+        return True
+
+    def is_running(self, exe_path):
+        with self.cond:
+            return exe_path in self.processes
+
+    def running_games(self):
+        """Paths of running games, most recently started last."""
+        with self.cond:
+            return [path for path, _ in sorted(self.processes.items(), key=lambda item: item[1][1])]
+
+    def _watch(self):
+        while True:
+            with self.cond:
+                # Sleep without a timeout while nothing is running
+                while self.running and not self.processes:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                exited = []
+                for path, (process, started) in list(self.processes.items()):
+                    exit_code = process.poll()
+                    if exit_code is not None:
+                        del self.processes[path]
+                        exited.append((path, started, time.time(), exit_code))
+
+            for path, started, ended, exit_code in exited:
+                try:
+                    self.on_exit(path, started, ended, exit_code)
+                except Exception as e:
+                    print(f"Error handling exit of {path}: {e}")
+
+            with self.cond:
+                if self.running and self.processes:
+                    self.cond.wait(self.poll_interval)
+
+    def stop(self):
+        """Stops watching (games keep running). Returns [(path, start_time, now)] for running games."""
+        with self.cond:
+            self.running = False
+            now = time.time()
+            sessions = [(path, started, now) for path, (_, started) in self.processes.items()]
+            self.processes.clear()
+            self.cond.notify_all()
+        return sessions
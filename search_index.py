@@ -0,0 +1,339 @@
+import bisect
+import heapq
+import re
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Rank of a match, lower is better
+RANK_PREFIX = 0      # name starts with the query
+RANK_WORD = 1        # every query word starts a word of the name
+RANK_SUBSTRING = 2   # every query word appears somewhere in the name
+RANK_TYPO = 3        # at least one query word only matched with one typo
+
+MIN_TYPO_LENGTH = 4
+
+# Matches returned by top(), a screenful many times over
+RESULT_LIMIT = 200
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+def _within_one_edit(a, b):
+    # Levenshtein distance <= 1, plus adjacent transpositions
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    if la > lb:
+        a, b = b, a
+    # b is one character longer than a
+    for i in range(len(a)):
+        if a[i] != b[i]:
+            return a[i:] == b[i + 1:]
+    return True
+
+class SortedPostings:
+    """
+    term -> list of entries in sorted order. Adds to a new term only append and the list
+    is sorted the next time it is read, so building a large index costs one sort per term;
+    once sorted, a term's list takes later adds in place.
+    """
+    def __init__(self):
+        self.entries = {}
+        self.unsorted = set()
+
+    def add(self, term, entry):
+        entries = self.entries.get(term)
+        if entries is None:
+            self.entries[term] = [entry]
+            self.unsorted.add(term)
+        elif term in self.unsorted:
+            entries.append(entry)
+        else:
+            bisect.insort(entries, entry)
+
+    def get(self, term):
+        entries = self.entries.get(term)
+        if entries is None:
+            return ()
+        if term in self.unsorted:
+            entries.sort()
+            self.unsorted.discard(term)
+        return entries
+
+    def sort(self):
+        for term in self.unsorted:
+            self.entries[term].sort()
+        self.unsorted.clear()
+
+    def discard(self, term, entry):
+        entries = self.get(term)
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+            if not entries:
+                del self.entries[term]
+
+class SearchIndex:
+    """
+    Incrementally maintained index over game names for typeahead search.
+    Query words of 3+ characters match anywhere in the name (trigram postings),
+    shorter ones match word prefixes, and whole words within one typo are accepted
+    at a lower rank. Pinned keys (favorites) come first among matches of equal rank.
+
+    Short prefixes also keep their names pre-ranked (pinned first, then by name), so
+    queries made only of short words, one or two keystrokes in, stream their best
+    matches instead of ranking and sorting a large part of the library.
+    """
+    def __init__(self):
+        self.names = {}                  # key -> lowercased name
+        self.key_tokens = {}             # key -> words of the name
+        self.trigrams = defaultdict(set) # trigram -> keys
+        self.prefixes = defaultdict(set) # 1 and 2 character word prefixes -> keys
+        self.tokens = defaultdict(set)   # word -> keys
+        self.deletes = defaultdict(set)  # word with one character deleted -> words
+        self.pinned = set()              # keys
+        self.sorted_prefixes = SortedPostings() # 1 and 2 character word prefixes -> [(not pinned, name, key)]
+        self.name_prefixes = SortedPostings()   # first 1 and 2 characters of the name -> [(not pinned, name, key)]
+
+    def __len__(self):
+        return len(self.names)
+
+    def sort(self):
+        """Sorts what bulk adds left unsorted now, instead of on the first queries that read it."""
+        self.sorted_prefixes.sort()
+        self.name_prefixes.sort()
+
+    def add(self, key, name, pinned=False):
+        if key in self.names:
+            self.remove(key)
+        name = name.lower()
+        tokens = TOKEN_RE.findall(name)
+        self.names[key] = name
+        self.key_tokens[key] = tokens
+        if pinned:
+            self.pinned.add(key)
+
+        for gram in _trigrams(name):
+            self.trigrams[gram].add(key)
+        self._add_sorted(key)
+        for token in tokens:
+            self.prefixes[token[:1]].add(key)
+            self.prefixes[token[:2]].add(key)
+            if not self.tokens[token] and len(token) >= MIN_TYPO_LENGTH - 1:
+                for d in _deletes(token):
+                    self.deletes[d].add(token)
+            self.tokens[token].add(key)
+
+    def remove(self, key):
+        name = self.names.pop(key, None)
+        if name is None:
+            return
+        self._discard_sorted(key, name)
+        tokens = self.key_tokens.pop(key)
+        self.pinned.discard(key)
+
+        for gram in _trigrams(name):
+            self._discard(self.trigrams, gram, key)
+        for token in tokens:
+            self._discard(self.prefixes, token[:1], key)
+            self._discard(self.prefixes, token[:2], key)
+            self._discard(self.tokens, token, key)
+            if token not in self.tokens:
+                for d in _deletes(token):
+                    self._discard(self.deletes, d, token)
+
+    def _discard(self, postings, term, value):
+        bucket = postings.get(term)
+        if bucket is not None:
+            bucket.discard(value)
+            if not bucket:
+                del postings[term]
+
+    def _add_sorted(self, key):
+        name = self.names[key]
+        entry = (key not in self.pinned, name, key)
+        for prefix in {t[:n] for t in self.key_tokens[key] for n in (1, 2)}:
+            self.sorted_prefixes.add(prefix, entry)
+        for prefix in {name[:1], name[:2]}:
+            self.name_prefixes.add(prefix, entry)
+
+    def _discard_sorted(self, key, name):
+        entry = (key not in self.pinned, name, key)
+        for prefix in {t[:n] for t in self.key_tokens[key] for n in (1, 2)}:
+            self.sorted_prefixes.discard(prefix, entry)
+        for prefix in {name[:1], name[:2]}:
+            self.name_prefixes.discard(prefix, entry)
+
+    def set_pinned(self, key, pinned):
+        if key not in self.names or (key in self.pinned) == pinned:
+            return
+        self._discard_sorted(key, self.names[key])
+        if pinned:
+            self.pinned.add(key)
+        else:
+            self.pinned.discard(key)
+        self._add_sorted(key)
+
+    def _word_matches(self, word, name, tokens):
+        if len(word) >= 3:
+            return word in name
+        return any(t.startswith(word) for t in tokens)
+
+    def _selectivity(self, word):
+        # Size of the postings _candidates starts from, smaller is more selective
+        if len(word) >= 3:
+            return min(len(self.trigrams.get(g, ())) for g in _trigrams(word))
+        return len(self.prefixes.get(word, ()))
+
+    def _candidates(self, word):
+        if len(word) >= 3:
+            # Verifying the rarest trigram's postings is cheaper than intersecting all of them
+            grams = _trigrams(word)
+            rarest = min((self.trigrams.get(g, ()) for g in grams), key=len)
+            return {k for k in rarest if word in self.names[k]}
+        return set(self.prefixes.get(word, ()))
+
+    def _typo_candidates(self, word):
+        if len(word) < MIN_TYPO_LENGTH:
+            return set()
+        similar = set()
+        for d in _deletes(word) | {word}:
+            similar.update(self.deletes.get(d, ()))
+            if d in self.tokens:
+                similar.add(d)
+        keys = set()
+        for token in similar:
+            if token != word and _within_one_edit(word, token):
+                keys.update(self.tokens[token])
+        return keys
+
+    def search(self, query, fuzzy=True):
+        """Returns {key: rank} for every name matching all words of the query."""
+        query = query.lower().strip()
+        words = TOKEN_RE.findall(query)
+        if not words:
+            return {}
+
+        # Most selective word first, the rest only filter the surviving candidates
+        words.sort(key=self._selectivity)
+        exact = self._candidates(words[0])
+        typo = self._typo_candidates(words[0]) - exact if fuzzy else set()
+
+        for word in words[1:]:
+            exact = {k for k in exact if self._word_matches(word, self.names[k], self.key_tokens[k])}
+            typo = {k for k in typo if self._word_matches(word, self.names[k], self.key_tokens[k])}
+
+        results = {key: self._rank(key, query, words) for key in exact}
+        for key in typo:
+            results[key] = RANK_TYPO
+        return results
+
+    def _rank(self, key, query, words):
+        # Rank of a key that matches every word exactly
+        if self.names[key].startswith(query):
+            return RANK_PREFIX
+        if all(any(t.startswith(w) for t in self.key_tokens[key]) for w in words):
+            return RANK_WORD
+        return RANK_SUBSTRING
+
+    def top(self, query, limit=RESULT_LIMIT, within=None):
+        """
+        Keys of the best matches for query, at most limit of them, ordered by rank, then
+        pinned keys before the others, then name. within, if given, is the set of keys
+        allowed in the result.
+        """
+        query = query.lower().strip()
+        words = TOKEN_RE.findall(query)
+        if not words:
+            return []
+        if max(len(w) for w in words) >= 3:
+            ranks = self.search(query)
+            if within is not None:
+                ranks = {k: r for k, r in ranks.items() if k in within}
+            return self._best(ranks, limit)
+
+        # Only short words: a key matches if it is in the prefix postings of every word
+        postings = sorted((self.prefixes.get(w, set()) for w in set(words)), key=len)
+        if len(postings) > 1 or (within is not None and len(within) < len(postings[0])):
+            # Set intersections run in C, what they leave is usually small enough to rank directly
+            matches = postings[0].intersection(*postings[1:])
+            if within is not None:
+                matches &= within
+            if len(matches) <= limit:
+                return self._best({k: self._rank(k, query, words) for k in matches}, limit)
+            allowed = matches
+        else:
+            # The streamed postings only hold matches, they just have to be allowed
+            allowed = within
+        return self._stream_short(query, min(words, key=self._selectivity), allowed, limit)
+
+    def _best(self, ranks, limit):
+        return heapq.nsmallest(limit, ranks, key=lambda k: (ranks[k], k not in self.pinned, self.names[k], k))
+
+    def _stream_short(self, query, word, allowed, limit):
+        # Names starting with the whole query (RANK_PREFIX), then every other match (RANK_WORD);
+        # both postings are already in (pinned, name) order
+        results = []
+        for entries, prefix_rank in ((self.name_prefixes.get(query[:2]), True), (self.sorted_prefixes.get(word), False)):
+            for pinned, name, key in entries:
+                if (allowed is None or key in allowed) and name.startswith(query) == prefix_rank:
+                    results.append(key)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+if __name__ == "__main__":
+    # Benchmark against a synthetic library, through GameManager.search as the app calls it
+    import json
+    import os
+    import random
+    import string
+    import tempfile
+    import time
+    from game_manager import GameManager
+    from storage import JsonStorage
+
+    random.seed(1)
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(20000)]
+    genres = ["Action", "Puzzle", "Indie", "Strategy", "RPG", "Racing"]
+    games = [{"name": " ".join(random.choices(words, k=random.randint(1, 4))).title(), "path": f"C:/Games/{i}.exe",
+              "favorite": random.random() < 0.01, "categories": random.sample(genres, random.randint(0, 2))}
+             for i in range(100000)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_file = os.path.join(directory, "games.json")
+        with open(data_file, "w") as f:
+            json.dump(games, f)
+        start = time.perf_counter()
+        manager = GameManager(data_file, os.path.join(directory, "icons"), storage=JsonStorage(data_file))
+        print(f"Loaded and indexed {len(manager.games)} games in {time.perf_counter() - start:.2f}s")
+
+    def run(label, queries, category=None):
+        timings = []
+        for q in queries:
+            start = time.perf_counter()
+            manager.search(q, category)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{label:<28} {len(queries):4} queries: median {timings[len(timings) // 2] * 1000:.3f}ms, "
+              f"p95 {timings[int(len(timings) * 0.95)] * 1000:.3f}ms, max {timings[-1] * 1000:.3f}ms")
+
+    run("1 character", list(string.ascii_lowercase))
+    run("1 character, in a category", list(string.ascii_lowercase), "Puzzle")
+    run("2 characters", [random.choice(words)[:2] for _ in range(200)])
+    for n in (3, 4, 6):
+        run(f"{n} characters", [random.choice(words)[:n] for _ in range(200)])
+    run("one typo", [w[:2] + w[3:] for w in random.sample(words, 200) if len(w) > 5])
+    run("two short words", [f"{random.choice(string.ascii_lowercase)} {random.choice(string.ascii_lowercase)}" for _ in range(200)])
+    run("two words", [f"{random.choice(words)[:4]} {random.choice(words)[:2]}" for _ in range(200)])
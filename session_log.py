@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+def day_key(moment):
+    return moment.strftime("%Y-%m-%d")
+
+def week_key(moment):
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def split_by_day(start, end):
+    """Yields (local datetime, seconds) for each calendar day a session touches."""
+    current = datetime.fromtimestamp(start)
+    finish = datetime.fromtimestamp(end)
+    while current < finish:
+        midnight = (current + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        chunk_end = min(midnight, finish)
+        yield current, (chunk_end - current).total_seconds()
+        current = chunk_end
+
+class SessionLog:
+    """
+    Append-only log of play sessions plus aggregates (per day, per week, per game)
+    that are updated as each session is recorded, never recomputed from history.
+    The aggregates are kept in a SQLite database together with the log offset they
+    cover, so startup only replays sessions appended after the last save. Saving
+    writes only the rows of the days, weeks and games that changed, in one transaction
+    with the offset.
+    """
+    def __init__(self, log_file="sessions.log", stats_file="session_stats.db", persister=None):
+        self.log_file = log_file
+        self.stats_file = stats_file
+        self.persister = persister
+
+        # Shared with the background persister, access is serialized by self.db_lock
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(stats_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS per_day (day TEXT PRIMARY KEY, seconds REAL NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS per_week (week TEXT PRIMARY KEY, seconds REAL NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS per_game (path TEXT PRIMARY KEY, total REAL NOT NULL, "
+                              "sessions INTEGER NOT NULL, last REAL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS per_game_week (week TEXT NOT NULL, path TEXT NOT NULL, "
+                              "seconds REAL NOT NULL, PRIMARY KEY (week, path))")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        self.offset = 0
+        self.per_day = {}       # "YYYY-MM-DD" -> seconds
+        self.per_week = {}      # "YYYY-Www" -> seconds
+        self.per_game = {}      # path -> {"total", "sessions", "last"}
+        self.per_game_week = {} # "YYYY-Www" -> {path: seconds}
+
+        # Keys changed since the last save_stats, and the changes not yet written (shared with the writer)
+        self.dirty_days, self.dirty_weeks, self.dirty_games = set(), set(), set()
+        self.unsaved = self._empty_stats(offset=None)
+        self.stats_lock = threading.Lock()
+        self.load()
+
+    def _empty_stats(self, offset=0, reset=False):
+        # reset: the rows on disk are dropped before these are written
+        return {"offset": offset, "reset": reset, "per_day": {}, "per_week": {}, "per_game": {}, "per_game_week": {}}
+
+    def load(self):
+        with self.db_lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'offset'").fetchone()
+            self.offset = int(row[0]) if row else 0
+            self.per_day = dict(self.conn.execute("SELECT day, seconds FROM per_day"))
+            self.per_week = dict(self.conn.execute("SELECT week, seconds FROM per_week"))
+            self.per_game = {path: {"total": total, "sessions": sessions, "last": last}
+                             for path, total, sessions, last in self.conn.execute("SELECT * FROM per_game")}
+            self.per_game_week = {}
+            for week, path, seconds in self.conn.execute("SELECT week, path, seconds FROM per_game_week"):
+                self.per_game_week.setdefault(week, {})[path] = seconds
+
+        if not os.path.exists(self.log_file):
+            return
+        if os.path.getsize(self.log_file) < self.offset:
+            # Log was replaced, rebuild from scratch
+            self.offset = 0
+            self.per_day, self.per_week, self.per_game, self.per_game_week = {}, {}, {}, {}
+            self.unsaved["reset"] = True
+
+        # Catch up with sessions written after the snapshot
+        replayed = False
+        with open(self.log_file, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break # Torn write from a crash, ignore it
+                self.offset += len(line)
+                try:
+                    path, start, end, exit_code = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(path, start, end)
+                replayed = True
+        if replayed or self.unsaved["reset"]:
+            self.save_stats()
+
+    def _apply(self, path, start, end):
+        for moment, seconds in split_by_day(start, end):
+            day, week = day_key(moment), week_key(moment)
+            self.dirty_days.add(day)
+            self.dirty_weeks.add(week)
+            self.per_day[day] = self.per_day.get(day, 0) + seconds
+            self.per_week[week] = self.per_week.get(week, 0) + seconds
+            games = self.per_game_week.setdefault(week, {})
+            games[path] = games.get(path, 0) + seconds
+
+        self.dirty_games.add(path)
+        game = self.per_game.setdefault(path, {"total": 0, "sessions": 0, "last": None})
+        game["total"] += end - start
+        game["sessions"] += 1
+        game["last"] = end
+
+    def record(self, path, start, end, exit_code=None):
+        line = (json.dumps([path, start, end, exit_code], separators=(",", ":")) + "\n").encode()
+        with open(self.log_file, "ab") as f:
+            f.write(line)
+        self.offset += len(line)
+        self._apply(path, start, end)
+        self.save_stats()
+
+    def save_stats(self):
+        # Copies only what changed, the writer merges it into its own snapshot
+        with self.stats_lock:
+            self.unsaved["offset"] = self.offset
+            for day in self.dirty_days:
+                self.unsaved["per_day"][day] = self.per_day[day]
+            for week in self.dirty_weeks:
+                self.unsaved["per_week"][week] = self.per_week[week]
+                self.unsaved["per_game_week"][week] = dict(self.per_game_week[week])
+            for path in self.dirty_games:
+                self.unsaved["per_game"][path] = dict(self.per_game[path])
+        self.dirty_days, self.dirty_weeks, self.dirty_games = set(), set(), set()
+
+        if self.persister:
+            # Submissions coalesce, the changes themselves accumulate in unsaved
+            self.persister.submit(self.stats_file, self._write_stats, None)
+        else:
+            self._write_stats(None)
+
+    def _write_stats(self, _):
+        with self.stats_lock:
+            changes, self.unsaved = self.unsaved, self._empty_stats(offset=None)
+        if changes["offset"] is None:
+            return # Already written along with an earlier submission
+        with self.db_lock, self.conn:
+            if changes["reset"]:
+                for table in ("per_day", "per_week", "per_game", "per_game_week"):
+                    self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany("INSERT OR REPLACE INTO per_day (day, seconds) VALUES (?, ?)",
+                                  changes["per_day"].items())
+            self.conn.executemany("INSERT OR REPLACE INTO per_week (week, seconds) VALUES (?, ?)",
+                                  changes["per_week"].items())
+            self.conn.executemany("INSERT OR REPLACE INTO per_game (path, total, sessions, last) VALUES (?, ?, ?, ?)",
+                                  [(path, g["total"], g["sessions"], g["last"]) for path, g in changes["per_game"].items()])
+            self.conn.executemany("INSERT OR REPLACE INTO per_game_week (week, path, seconds) VALUES (?, ?, ?)",
+                                  [(week, path, seconds) for week, games in changes["per_game_week"].items()
+                                   for path, seconds in games.items()])
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('offset', ?)", (str(changes["offset"]),))
+
+    def close(self):
+        # After the persister has stopped, nothing writes any more
+        with self.db_lock:
+            self.conn.close()
+
+    def time_this_week(self, path=None):
+        week = week_key(datetime.now())
+        if path is None:
+            return self.per_week.get(week, 0)
+        return self.per_game_week.get(week, {}).get(path, 0)
+
+    def time_on_day(self, day=None):
+        return self.per_day.get(day_key(day or datetime.now()), 0)
+
+    def game_stats(self, path):
+        return self.per_game.get(path, {"total": 0, "sessions": 0, "last": None})
@@ -1,9 +1,11 @@
 import json
 import os
+from storage import atomic_write_json
 
 class SettingsManager:
-    def __init__(self, settings_file="settings.json"):
+    def __init__(self, settings_file="settings.json", persister=None):
         self.settings_file = settings_file
+        self.persister = persister
         self.settings = self.load_settings()
         
         self.translations = {
@@ -57,7 +59,18 @@ class SettingsManager:
                 "startup_video": "Startup Video",
                 "select_video": "Select Video",
                 "remove_video": "Remove Video",
-                "launch_args": "Launch Arguments"
+                "launch_args": "Launch Arguments",
+                "scan_folder": "Scan Folder",
+                "importing": "Importing games...",
+                "games_added": "added",
+                "close": "Close",
+                "fetching": "Fetching...",
+                "this_week": "This week",
+                "shuffle": "Shuffle",
+                "repeat_off": "Repeat: Off",
+                "repeat_all": "Repeat: All",
+                "repeat_one": "Repeat: One",
+                "indexing": "Indexing music..."
             },
             "es": {
                 "window_title": "Lanzador de Juegos",
@@ -109,7 +122,18 @@ class SettingsManager:
                 "startup_video": "Video de Inicio",
                 "select_video": "Seleccionar Video",
                 "remove_video": "Eliminar Video",
-                "launch_args": "Argumentos de Lanzamiento"
+                "launch_args": "Argumentos de Lanzamiento",
+                "scan_folder": "Escanear Carpeta",
+                "importing": "Importando juegos...",
+                "games_added": "añadidos",
+                "close": "Cerrar",
+                "fetching": "Obteniendo...",
+                "this_week": "Esta semana",
+                "shuffle": "Aleatorio",
+                "repeat_off": "Repetir: No",
+                "repeat_all": "Repetir: Todo",
+                "repeat_one": "Repetir: Una",
+                "indexing": "Indexando música..."
             }
         }
 
@@ -123,8 +147,13 @@ class SettingsManager:
         return {"language": "en"}
 
     def save_settings(self):
-        with open(self.settings_file, "w") as f:
-            json.dump(self.settings, f, indent=4)
+        if self.persister:
+            self.persister.submit(self.settings_file, self._write_settings, dict(self.settings))
+        else:
+            self._write_settings(self.settings)
+
+    def _write_settings(self, settings):
+        atomic_write_json(self.settings_file, settings, indent=4)
 
     def get_setting(self, key, default=None):
         return self.settings.get(key, default)
@@ -1,21 +1,57 @@
 import pygame
 import os
+import queue
+import threading
+import time
+
+# priority: who may steal whose voice, max_voices: simultaneous copies of one effect,
+# min_interval: seconds before the same effect may start again
+SOUND_PROFILES = {
+    "hover": {"priority": 0, "max_voices": 1, "min_interval": 0.06},
+    "click": {"priority": 1, "max_voices": 2, "min_interval": 0.03},
+    "back": {"priority": 1, "max_voices": 2, "min_interval": 0.05},
+    "launch": {"priority": 2, "max_voices": 1, "min_interval": 0.2}
+}
 
 class SoundManager:
-    def __init__(self, sounds_dir="sounds"):
+    """
+    UI sound effects on a pool of reserved mixer channels. play() only queues the
+    request; a worker thread assigns it a voice, retriggering the effect's oldest
+    voice when it is at max_voices and otherwise stealing the oldest voice of
+    equal or lower priority when the pool is full.
+    """
+    def __init__(self, sounds_dir="sounds", pool_size=8):
         self.sounds_dir = sounds_dir
         self.sounds = {}
         self.enabled = True
-        
+
         if not os.path.exists(self.sounds_dir):
             os.makedirs(self.sounds_dir)
-            
+
         # Initialize pygame mixer if not already done
         if not pygame.mixer.get_init():
             pygame.mixer.init()
-            
+
+        # The first pool_size channels are ours, Sound.play() elsewhere never picks them
+        if pygame.mixer.get_num_channels() < pool_size:
+            pygame.mixer.set_num_channels(pool_size)
+        pygame.mixer.set_reserved(pool_size)
+        self.channels = [pygame.mixer.Channel(i) for i in range(pool_size)]
+        self.voices = [None] * pool_size # channel index -> (sound name, priority, start time)
+
+        self.last_played = {}
+        self.requests = queue.SimpleQueue()
+
+        # Counters
+        self.played = 0
+        self.dropped = 0
+        self.stolen = 0
+
         self.load_sounds()
 
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
     def load_sounds(self):
         sound_files = {
             "hover": "hover.wav",
@@ -23,22 +59,71 @@ class SoundManager:
             "launch": "launch.wav",
             "back": "back.wav"
         }
-        
+
         for name, filename in sound_files.items():
             path = os.path.join(self.sounds_dir, filename)
-            if os.path.exists(path):
-                try:
+            try:
+                if os.path.exists(path):
                     self.sounds[name] = pygame.mixer.Sound(path)
-                    self.sounds[name].set_volume(0.3) # Default volume
-                except Exception as e:
-                    print(f"Error loading sound {name}: {e}")
+                else:
+                    # Missing file: synthesize the default sound straight into the mixer
+                    from generate_sounds import make_sound
+                    self.sounds[name] = make_sound(name)
+                self.sounds[name].set_volume(0.3) # Default volume
+            except Exception as e:
+                print(f"Error loading sound {name}: {e}")
 
     def play(self, sound_name):
-        if self.enabled and sound_name in self.sounds:
+        """Queues a sound effect and returns immediately. Retriggers faster than the effect's min_interval are dropped."""
+        if not self.enabled or sound_name not in self.sounds:
+            return
+        profile = SOUND_PROFILES.get(sound_name, {"min_interval": 0})
+        now = time.monotonic()
+        if now - self.last_played.get(sound_name, float("-inf")) < profile["min_interval"]:
+            self.dropped += 1
+            return
+        self.last_played[sound_name] = now
+        self.requests.put(sound_name)
+
+    def _run(self):
+        while True:
+            sound_name = self.requests.get()
             try:
-                self.sounds[sound_name].play()
-            except:
-                pass
+                self._start(sound_name)
+            except Exception as e:
+                print(f"Error playing sound {sound_name}: {e}")
+
+    def _start(self, sound_name):
+        profile = SOUND_PROFILES.get(sound_name, {"priority": 1, "max_voices": 1})
+        priority = profile["priority"]
+
+        # Forget voices whose channel has finished
+        for i, channel in enumerate(self.channels):
+            if self.voices[i] and not channel.get_busy():
+                self.voices[i] = None
+
+        own = [i for i, voice in enumerate(self.voices) if voice and voice[0] == sound_name]
+        if len(own) >= profile["max_voices"]:
+            # Restart the oldest copy of this effect instead of stacking another one
+            slot = min(own, key=lambda i: self.voices[i][2])
+            self.stolen += 1
+        elif None in self.voices:
+            slot = self.voices.index(None)
+        else:
+            candidates = [i for i, voice in enumerate(self.voices) if voice[1] <= priority]
+            if not candidates:
+                self.dropped += 1
+                return
+            slot = min(candidates, key=lambda i: (self.voices[i][1], self.voices[i][2]))
+            self.stolen += 1
+
+        self.channels[slot].play(self.sounds[sound_name])
+        self.voices[slot] = (sound_name, priority, time.monotonic())
+        self.played += 1
+
+    def stats(self):
+        return {"played": self.played, "dropped": self.dropped, "stolen": self.stolen,
+                "busy": sum(1 for voice in self.voices if voice)}
 
     def set_volume(self, volume):
         # volume 0.0 to 1.0
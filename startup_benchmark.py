@@ -0,0 +1,121 @@
+"""
+Startup benchmark for the launcher.
+
+    python startup_benchmark.py            # measure and compare against startup_budget.json
+    python startup_benchmark.py --record   # measure and store the result as the new budget
+
+Measures the import time of app.py (python -X importtime), the time from process
+start to the first painted frame (through the GAMELAUNCHER_STARTUP_PROBE hook in
+app.py) and which modules were loaded by then. Exits with 1 when a budget is exceeded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BUDGET_FILE = "startup_budget.json"
+
+# Only loaded when the feature is used, never during startup
+LAZY_MODULES = ["cv2", "paho", "pystray"]
+
+def parse_importtime(stderr, module="app"):
+    """Returns ({directly imported module: cumulative µs}, total µs) for module from -X importtime output."""
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        # Lines come out after their own imports, so a top level line closes the group before it
+        if depth == 0:
+            if name == module:
+                return children, int(cumulative_us)
+            children = {}
+        elif depth == 1:
+            children[name] = int(cumulative_us)
+    raise RuntimeError(f"{module} not found in the import time report")
+
+def measure_imports():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import app failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def measure_first_paint():
+    """Starts the launcher, returns (ms until the first frame was painted, loaded modules)."""
+    fd, probe_file = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    os.remove(probe_file)
+    env = dict(os.environ, GAMELAUNCHER_STARTUP_PROBE=probe_file)
+    try:
+        started = time.time()
+        subprocess.run([sys.executable, "app.py"], env=env, timeout=60)
+        if not os.path.exists(probe_file):
+            raise RuntimeError("The launcher exited without reporting its first paint")
+        with open(probe_file, "r") as f:
+            probe = json.load(f)
+    finally:
+        if os.path.exists(probe_file):
+            os.remove(probe_file)
+    return (probe["first_paint"] - started) * 1000, probe["modules"]
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--record", action="store_true", help="store this run (plus headroom) as the budget")
+    parser.add_argument("--headroom", type=float, default=1.25)
+    args = parser.parse_args()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    import_runs, paint_runs, packages, modules = [], [], {}, []
+    for _ in range(args.runs):
+        packages, total = measure_imports()
+        import_runs.append(total / 1000)
+        paint_ms, modules = measure_first_paint()
+        paint_runs.append(paint_ms)
+    import_ms, paint_ms = median(import_runs), median(paint_runs)
+    loaded = sorted({name.split(".")[0] for name in modules} & set(LAZY_MODULES))
+
+    print("Slowest imports of app.py:")
+    for name, us in sorted(packages.items(), key=lambda item: -item[1])[:15]:
+        print(f"  {name:<24} {us / 1000:8.1f}ms")
+    print(f"import app:   {import_ms:.1f}ms (median of {args.runs})")
+    print(f"first paint:  {paint_ms:.1f}ms (median of {args.runs})")
+    print(f"lazy modules loaded at first paint: {', '.join(loaded) or 'none'}")
+
+    if args.record:
+        budget = {
+            "import_ms": round(import_ms * args.headroom),
+            "first_paint_ms": round(paint_ms * args.headroom),
+            "lazy_modules": LAZY_MODULES
+        }
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=4)
+        print(f"Budget written to {BUDGET_FILE}")
+        return 0
+
+    with open(BUDGET_FILE, "r") as f:
+        budget = json.load(f)
+    failures = []
+    if import_ms > budget["import_ms"]:
+        failures.append(f"import app took {import_ms:.1f}ms, budget is {budget['import_ms']}ms")
+    if paint_ms > budget["first_paint_ms"]:
+        failures.append(f"first paint took {paint_ms:.1f}ms, budget is {budget['first_paint_ms']}ms")
+    for name in sorted({name.split(".")[0] for name in modules} & set(budget["lazy_modules"])):
+        failures.append(f"{name} is imported before the first paint")
+
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
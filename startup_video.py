@@ -0,0 +1,165 @@
+import queue
+import threading
+import time
+import tkinter
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+class Cv2FrameSource:
+    """Decodes a video with OpenCV and scales each frame to size, reusing its buffers."""
+    def __init__(self, path, size):
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else 30
+        # Container's estimate, 0 if unknown
+        self.frame_count = max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        self.size = size
+        self.raw = None
+        self.scaled = np.empty((size[1], size[0], 3), np.uint8)
+
+    def read_into(self, out):
+        ret, self.raw = self.cap.read(self.raw)
+        if not ret:
+            return False
+        cv2.resize(self.raw, self.size, dst=self.scaled, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self.scaled, cv2.COLOR_BGR2RGB, dst=out)
+        return True
+
+    def skip(self):
+        # Advances one frame without converting or scaling it
+        return self.cap.grab()
+
+    def close(self):
+        self.cap.release()
+
+class StartupVideoPlayer:
+    """
+    Plays frames from a source on a Tk window. A decoder thread fills a bounded
+    queue of preallocated RGB buffers; the Tk side shows each frame when it is due
+    by the wall clock (source.fps) and drops frames that are already late.
+    """
+    def __init__(self, window, source, on_finish, queue_size=4):
+        self.window = window
+        self.source = source
+        self.on_finish = on_finish
+        self.fps = source.fps
+        width, height = source.size
+
+        # Buffers cycle free -> decoder -> ready -> Tk -> free, nothing is allocated per frame
+        self.buffers = [np.empty((height, width, 3), np.uint8) for _ in range(queue_size + 2)]
+        self.free = queue.Queue()
+        for i in range(len(self.buffers)):
+            self.free.put(i)
+        self.ready = queue.Queue(maxsize=queue_size)
+        self.pending = None
+        self.stop_event = threading.Event()
+        self.finished = False
+        self.after_id = None
+        self.start_time = None
+        self.shown = 0
+        self.dropped = 0
+
+        # One PhotoImage, updated in place for every frame
+        self.photo = ImageTk.PhotoImage("RGB", (width, height))
+        # Frames are unpacked into one reused image held in a single block of memory, which
+        # paste() hands to Tk as is. A new image per frame would also be converted into a block.
+        self.frame_image = Image.new("RGB", (width, height))
+        self.frame_image.im = Image.core.new_block("RGB", (width, height))
+        self.label = tkinter.Label(window, image=self.photo, bg="black", bd=0, highlightthickness=0)
+        self.label.pack(fill="both", expand=True)
+
+        self.thread = threading.Thread(target=self._decode, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.after_id = self.window.after(1, self._present)
+
+    def _decode(self):
+        index = 0
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    slot = self.free.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if not self.source.read_into(self.buffers[slot]):
+                    break
+                while not self.stop_event.is_set():
+                    try:
+                        self.ready.put((index, slot), timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                index += 1
+        finally:
+            self.source.close()
+            self._put_end()
+
+    def _put_end(self):
+        # End of stream marker; if the player was stopped nobody reads it
+        while not self.stop_event.is_set():
+            try:
+                self.ready.put(None, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _present(self):
+        self.after_id = None
+        if self.finished:
+            return
+        now = time.monotonic()
+        if self.start_time is None:
+            self.start_time = now
+        due = int((now - self.start_time) * self.fps)
+
+        frame = None
+        while True:
+            item = self.pending
+            self.pending = None
+            if item is None:
+                try:
+                    item = self.ready.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._finish()
+                    return
+            index, slot = item
+            if index > due:
+                # Early, keep it for its turn
+                self.pending = item
+                break
+            if frame is not None:
+                # A newer frame is also due, the older one is late
+                self.free.put(frame[1])
+                self.dropped += 1
+            frame = item
+
+        if frame is not None:
+            index, slot = frame
+            self.frame_image.frombytes(self.buffers[slot])
+            self.photo.paste(self.frame_image)
+            self.free.put(slot)
+            self.shown += 1
+
+        if self.pending is not None:
+            delay = (self.pending[0] / self.fps) - (time.monotonic() - self.start_time)
+        else:
+            delay = 1 / self.fps / 4
+        self.after_id = self.window.after(max(1, int(delay * 1000)), self._present)
+
+    def stop(self):
+        """Skips the rest of the video, calls on_finish right away."""
+        self._finish()
+
+    def _finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        self.stop_event.set()
+        if self.after_id is not None:
+            self.window.after_cancel(self.after_id)
+            self.after_id = None
+        self.on_finish()
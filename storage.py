@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+def atomic_write_json(path, data, indent=None):
+    # Write to a temp file in the same directory, then swap it in, so a crash never leaves a truncated file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class JsonStorage:
+    """
+    Original games.json format. Every mutation rewrites the whole file, but atomically.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.records = {} # path -> record, in library order
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r") as f:
+                records = json.load(f)
+        except json.JSONDecodeError:
+            return []
+        self.records = {r["path"]: r for r in records if "path" in r}
+        return records
+
+    def put(self, record):
+        self.records[record["path"]] = record
+        atomic_write_json(self.path, list(self.records.values()), indent=4)
+
+    def delete(self, path):
+        if self.records.pop(path, None) is not None:
+            atomic_write_json(self.path, list(self.records.values()), indent=4)
+
+    def save_all(self, records):
+        self.records = {r["path"]: r for r in records}
+        atomic_write_json(self.path, records, indent=4)
+
+    def mtime(self):
+        return os.path.getmtime(self.path) if os.path.exists(self.path) else None
+
+    def close(self):
+        pass
+
+class SQLiteStorage:
+    """
+    One row per game in a WAL-mode SQLite database, so a mutation writes one record
+    in its own transaction regardless of the library size.
+    """
+    def __init__(self, path, import_from=None):
+        self.path = path
+        self.lock = threading.Lock()
+        # Shared with the background persister, access is serialized by self.lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS games (path TEXT PRIMARY KEY, position INTEGER NOT NULL, data TEXT NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.next_position = self.conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM games").fetchone()[0]
+
+        if import_from and self.get_meta("imported_from") is None:
+            self.import_json(import_from)
+
+    def get_meta(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def import_json(self, json_path):
+        """One-time import of an existing games.json, skipped on later starts."""
+        records = []
+        if os.path.exists(json_path):
+            try:
+                with open(json_path, "r") as f:
+                    records = json.load(f)
+            except json.JSONDecodeError as e:
+                print(f"Could not import {json_path}: {e}")
+                return
+        records = [r for r in records if r.get("path") and r.get("name")]
+        with self.lock, self.conn:
+            for record in records:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO games (path, position, data) VALUES (?, ?, ?)",
+                    (record["path"], self.next_position, json.dumps(record))
+                )
+                self.next_position += 1
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_from', ?)", (json_path,))
+        if records:
+            print(f"Imported {len(records)} games from {json_path}")
+
+    def load(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT data FROM games ORDER BY position").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def put(self, record):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO games (path, position, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET data = excluded.data",
+                (record["path"], self.next_position, json.dumps(record))
+            )
+            self.next_position += 1
+
+    def delete(self, path):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM games WHERE path = ?", (path,))
+
+    def save_all(self, records):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM games")
+            self.conn.executemany(
+                "INSERT INTO games (path, position, data) VALUES (?, ?, ?)",
+                [(r["path"], i, json.dumps(r)) for i, r in enumerate(records)]
+            )
+            self.next_position = len(records)
+
+    def mtime(self):
+        # Committed changes may still live in the WAL file until the next checkpoint;
+        # an empty WAL is just created by opening the database and changes nothing
+        times = [os.path.getmtime(p) for p in (self.path, self.path + "-wal") if os.path.exists(p) and os.path.getsize(p)]
+        return max(times) if times else None
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+def open_storage(data_file):
+    """
+    SQLite database next to data_file, importing data_file on first use.
+    Set GAMELAUNCHER_STORAGE=json to keep the plain JSON file instead.
+    """
+    if os.environ.get("GAMELAUNCHER_STORAGE") == "json":
+        return JsonStorage(data_file)
+    if data_file.endswith(".db"):
+        return SQLiteStorage(data_file)
+    return SQLiteStorage(os.path.splitext(data_file)[0] + ".db", import_from=data_file)
@@ -0,0 +1,81 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+from icon_extractor import RT_GROUP_ICON, RT_ICON, PEResources, PNG_SIGNATURE, extract_icon, extract_icons
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PE32 = os.path.join(FIXTURES, "icon_pe32.exe")
+PE32_PLUS = os.path.join(FIXTURES, "icon_pe32plus.exe")
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+class PEResourcesTest(unittest.TestCase):
+    def test_pe32_named_group(self):
+        pe = PEResources(read(PE32))
+        self.assertEqual(list(pe.resources(RT_GROUP_ICON)), ["MAINICON"])
+        self.assertEqual(sorted(pe.resources(RT_ICON)), [1, 2])
+        self.assertTrue(pe.resource(RT_ICON, 2).startswith(PNG_SIGNATURE))
+        self.assertEqual(pe.resource(RT_GROUP_ICON), pe.resource(RT_GROUP_ICON, "MAINICON"))
+
+    def test_pe32_plus(self):
+        pe = PEResources(read(PE32_PLUS))
+        self.assertEqual(list(pe.resources(RT_GROUP_ICON)), [1])
+        # 32x32 32bpp bitmap: BITMAPINFOHEADER with the height doubled for the mask
+        header_size, width, height = struct.unpack_from("<Iii", pe.resource(RT_ICON, 2))
+        self.assertEqual((header_size, width, height), (40, 32, 64))
+
+    def test_missing_resource(self):
+        pe = PEResources(read(PE32))
+        self.assertIsNone(pe.resource(RT_ICON, 3))
+        self.assertIsNone(pe.resource(99))
+
+class ExtractIconTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def output(self, name):
+        return os.path.join(self.temp_dir.name, "icons", name)
+
+    def test_png_icon_written_as_is(self):
+        # The 48x48 PNG beats the 16x16 bitmap
+        path = extract_icon(PE32, self.output("pe32.png"))
+        self.assertEqual(path, self.output("pe32.png"))
+        self.assertEqual(read(path), bytes(PEResources(read(PE32)).resource(RT_ICON, 2)))
+        self.assertEqual(struct.unpack_from(">II", read(path), 16), (48, 48))
+
+    @unittest.skipUnless(Image, "Pillow is not installed")
+    def test_bitmap_icon_decoded(self):
+        # The 32x32 bitmap beats the 16x16 PNG
+        path = extract_icon(PE32_PLUS, self.output("pe32plus.png"))
+        with Image.open(path) as img:
+            self.assertEqual(img.size, (32, 32))
+            self.assertEqual(img.convert("RGBA").getpixel((5, 5)), (0, 200, 0, 255))
+
+    def test_not_an_executable(self):
+        with mock.patch("builtins.print"):
+            self.assertIsNone(extract_icon(os.path.abspath(__file__), self.output("nope.png")))
+        self.assertFalse(os.path.exists(self.output("nope.png")))
+
+    def test_extract_icons_keeps_order(self):
+        jobs = [(PE32, self.output("a.png")), (os.path.abspath(__file__), self.output("b.png"))]
+        if Image:
+            jobs.insert(1, (PE32_PLUS, self.output("c.png")))
+        with mock.patch("builtins.print"):
+            results = extract_icons(jobs, max_workers=2)
+        self.assertEqual(results, [output if source != os.path.abspath(__file__) else None for source, output in jobs])
+
+if __name__ == "__main__":
+    unittest.main()
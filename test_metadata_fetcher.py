@@ -0,0 +1,180 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from metadata_fetcher import MetadataClient, ResponseCache
+
+# Stand-in catalogue: search term -> (app id, details)
+GAMES = {
+    "portal": (400, {"short_description": "A puzzle game.", "header_image": "http://img/400.jpg",
+                     "genres": [{"description": "Puzzle"}]}),
+    "celeste": (504230, {"short_description": "Climb a mountain.", "header_image": "http://img/504230.jpg",
+                         "genres": [{"description": "Platformer"}, {"description": "Indie"}]}),
+    "delisted": (999, None) # Found by the search, but its details are gone (404)
+}
+
+class SteamStandIn(BaseHTTPRequestHandler):
+    """Mimics /api/storesearch and /api/appdetails, with scripted failure statuses per path."""
+    protocol_version = "HTTP/1.1" # Keep-alive, like the real store
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        with self.server.lock:
+            self.server.hits.append(url.path)
+            failures = self.server.failures.get(url.path, [])
+            status = failures.pop(0) if failures else 200
+
+        if status != 200:
+            self._send(status, {})
+        elif url.path == "/api/storesearch/":
+            game = GAMES.get(query["term"][0])
+            items = [{"id": game[0]}] if game else []
+            self._send(200, {"total": len(items), "items": items})
+        elif url.path == "/api/appdetails":
+            app_id = query["appids"][0]
+            details = {str(i): d for i, d in GAMES.values() if d}.get(app_id)
+            if details:
+                self._send(200, {app_id: {"success": True, "data": details}})
+            else:
+                self._send(404, {})
+        else:
+            self._send(404, {})
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class MetadataClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SteamStandIn)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.hits = []
+        self.server.failures = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def client(self, **kwargs):
+        options = {"host": "127.0.0.1", "port": self.server.server_address[1], "https": False,
+                   "cache_file": os.path.join(self.temp_dir.name, "cache.db"), "backoff": 0.01, "rate": 1000}
+        options.update(kwargs)
+        client = MetadataClient(**options)
+        self.clients.append(client)
+        return client
+
+    def test_fetch(self):
+        data = self.client().fetch("Portal")
+        self.assertEqual(data, {"description": "A puzzle game.", "image_url": "http://img/400.jpg", "genres": ["Puzzle"]})
+
+    def test_keep_alive_reuse(self):
+        client = self.client(max_workers=1, cache_file=None)
+        client.submit("portal").result()
+        client.submit("celeste").result()
+        self.assertEqual(client.requests, 4)
+        self.assertEqual(client.connections, 1)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_retries_429_and_5xx(self):
+        self.server.failures["/api/storesearch/"] = [429, 503]
+        client = self.client(retries=2)
+        started = time.monotonic()
+        self.assertIsNotNone(client.fetch("portal"))
+        # Backoff of 0.01s then 0.02s
+        self.assertGreaterEqual(time.monotonic() - started, 0.03)
+        self.assertEqual(self.server.hits.count("/api/storesearch/"), 3)
+
+    def test_gives_up_after_retries(self):
+        self.server.failures["/api/storesearch/"] = [500, 500, 500]
+        client = self.client(retries=1)
+        with self.assertRaises(Exception):
+            client.fetch("portal")
+        self.assertEqual(self.server.hits.count("/api/storesearch/"), 2)
+
+    def test_cache_and_ttl_expiry(self):
+        client = self.client()
+        client.fetch("portal")
+        client.fetch("portal")
+        self.assertEqual(len(self.server.hits), 2)
+        self.assertEqual(client.cache_hits, 2)
+
+        # A week and a bit later the cached responses are stale
+        now = time.time()
+        with mock.patch("metadata_fetcher.time.time", return_value=now + client.cache.ttl + 1):
+            client.fetch("portal")
+        self.assertEqual(len(self.server.hits), 4)
+
+    def test_negative_caching(self):
+        client = self.client()
+        self.assertIsNone(client.fetch("delisted"))
+        self.assertIsNone(client.fetch("delisted"))
+        self.assertEqual(self.server.hits, ["/api/storesearch/", "/api/appdetails"])
+
+        # The 404 expires sooner than the search result
+        cache = client.cache
+        self.assertLess(cache.negative_ttl, cache.ttl)
+        now = time.time()
+        with mock.patch("metadata_fetcher.time.time", return_value=now + cache.negative_ttl + 1):
+            self.assertIsNone(client.fetch("delisted"))
+        self.assertEqual(self.server.hits, ["/api/storesearch/", "/api/appdetails", "/api/appdetails"])
+
+    def test_fetch_many(self):
+        client = self.client(max_workers=3)
+        results = client.fetch_many(["portal", "celeste", "unknown game"])
+        self.assertEqual(results["portal"]["genres"], ["Puzzle"])
+        self.assertEqual(results["celeste"]["genres"], ["Platformer", "Indie"])
+        self.assertIsNone(results["unknown game"])
+        self.assertLessEqual(client.connections, 3)
+
+    def test_fetch_many_reports_failures_as_none(self):
+        self.server.failures["/api/appdetails"] = [503] * 10
+        client = self.client(retries=0)
+        with mock.patch("builtins.print"):
+            results = client.fetch_many(["portal"])
+        self.assertEqual(results, {"portal": None})
+
+class ResponseCacheTest(unittest.TestCase):
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache.db")
+            cache = ResponseCache(path)
+            cache.put("/a", {"x": 1})
+            cache.put("/b", None)
+            cache.close()
+
+            cache = ResponseCache(path)
+            self.assertEqual(cache.get("/a"), (True, {"x": 1}))
+            self.assertEqual(cache.get("/b"), (True, None))
+            self.assertEqual(cache.get("/c"), (False, None))
+            cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
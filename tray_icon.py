@@ -1,4 +1,3 @@
-import pystray
 from PIL import Image
 import threading
 import os
@@ -12,6 +11,7 @@ class TrayIcon:
         self.thread = None
 
     def create_menu(self):
+        import pystray
         return pystray.Menu(
             pystray.MenuItem("Open", self.on_show),
             pystray.MenuItem("Quit", self.on_quit)
@@ -28,6 +28,8 @@ class TrayIcon:
             print("Tray icon not found")
             return
 
+        # Imported on the tray thread so it never delays the window
+        import pystray
         image = Image.open(self.icon_path)
         self.icon = pystray.Icon("GameLauncher", image, "Game Launcher", self.create_menu())
         self.icon.run()
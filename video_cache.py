@@ -0,0 +1,247 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+CACHE_DIR = "video_cache"
+MAGIC = b"GLVC"
+VERSION = 3
+HEADER = struct.Struct("<4sIIIdIQ") # magic, version, width, height, fps, frame count, index offset
+INDEX_ENTRY = struct.Struct("<QI") # frame offset, stored length (the full frame size if stored raw)
+
+# Frames are stored zlib-compressed at this level when that pays off
+COMPRESS_LEVEL = 1
+# A compressed frame is kept only if inflating it takes at most this share of the frame interval,
+# otherwise it is stored raw: noisy 1080p frames inflate in 30-45ms even at level 1
+INFLATE_SHARE = 0.5
+# Frames are inflated into the player's buffer this many bytes at a time
+INFLATE_CHUNK = 1024 * 1024
+# Compression assumed when checking a video against the budget before transcoding
+EXPECTED_RATIO = 2
+# Long videos are cached with every nth frame to fit the budget, but never below this rate
+MIN_CACHED_FPS = 15
+
+class MmapFrameSource:
+    """Frame source over a cached store of pre-scaled RGB frames, raw or compressed, read through mmap."""
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise
+        try:
+            magic, version, width, height, fps, count, index_offset = HEADER.unpack_from(self.mm, 0)
+            if magic != MAGIC or version != VERSION or len(self.mm) < index_offset + count * INDEX_ENTRY.size:
+                raise ValueError(f"Invalid video cache {path}")
+            self.index = [INDEX_ENTRY.unpack_from(self.mm, index_offset + i * INDEX_ENTRY.size) for i in range(count)]
+            if any(offset + length > index_offset for offset, length in self.index):
+                raise ValueError(f"Invalid video cache {path}")
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self.size = (width, height)
+        self.fps = fps
+        self.count = count
+        self.frame_bytes = width * height * 3
+        self.position = 0
+
+    def read_into(self, out):
+        if self.position >= self.count:
+            return False
+        offset, length = self.index[self.position]
+        with memoryview(self.mm) as view, memoryview(out) as target:
+            target = target.cast("B")
+            data = view[offset:offset + length]
+            if length == self.frame_bytes:
+                target[:] = data
+            elif not self._inflate(data, target):
+                return False
+        self.position += 1
+        return True
+
+    def _inflate(self, data, target):
+        # In chunks straight into the buffer, rather than a new full-size frame each time
+        inflater = zlib.decompressobj()
+        filled = 0
+        while filled < self.frame_bytes:
+            chunk = inflater.decompress(data, min(INFLATE_CHUNK, self.frame_bytes - filled))
+            if not chunk:
+                return False
+            target[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+            data = inflater.unconsumed_tail
+        return True
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+class VideoCache:
+    """
+    Startup videos transcoded to the screen resolution, one file per
+    (video path, mtime, width, height). A changed video or screen gives a new key,
+    so stale entries are never read; they are pruned when a new one is built.
+    Videos that don't fit budget_bytes even at a reduced frame rate get a marker
+    instead, so they are decoded live without trying to cache them again.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, budget_bytes=1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.budget_bytes = budget_bytes
+        self.building = set()
+        self.lock = threading.Lock()
+
+    def key_path(self, video_path, size):
+        try:
+            mtime = os.stat(video_path).st_mtime_ns
+        except OSError:
+            return None
+        key = f"{os.path.abspath(video_path)}|{mtime}|{size[0]}x{size[1]}|v{VERSION}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".frames")
+
+    def _marker(self, path):
+        return os.path.splitext(path)[0] + ".toolarge"
+
+    def too_large(self, path):
+        # The marker holds the budget it failed with, a bigger budget tries again
+        try:
+            with open(self._marker(path), "r") as f:
+                return int(f.read()) >= self.budget_bytes
+        except (OSError, ValueError):
+            return False
+
+    def _mark_too_large(self, path):
+        print("Startup video is too large to cache, it will be decoded live")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._marker(path), "w") as f:
+            f.write(str(self.budget_bytes))
+
+    def open(self, video_path, size):
+        """Returns an MmapFrameSource for a cached video, or None if it has to be decoded live."""
+        path = self.key_path(video_path, size)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return MmapFrameSource(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error opening video cache: {e}")
+            return None
+
+    def build(self, video_path, size):
+        """Transcodes the video into the cache. Returns the cache file, or None if it was not cached."""
+        import numpy as np
+        from startup_video import Cv2FrameSource
+
+        path = self.key_path(video_path, size)
+        if not path or self.too_large(path):
+            return None
+        if os.path.exists(path):
+            return path
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        source = Cv2FrameSource(video_path, size)
+        frame = np.empty((size[1], size[0], 3), np.uint8)
+
+        # Check the container's frame count first, and keep every nth frame if that makes it fit
+        estimate = source.frame_count * frame.nbytes / EXPECTED_RATIO
+        step = max(1, math.ceil(estimate / self.budget_bytes))
+        if source.fps / step < MIN_CACHED_FPS:
+            source.close()
+            self._mark_too_large(path)
+            self.prune(keep=path)
+            return None
+
+        temp_path = path + ".tmp"
+        index = []
+        complete = False
+        try:
+            with open(temp_path, "wb") as f:
+                offset = HEADER.size
+                f.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], source.fps / step, 0, 0))
+                inflate_limit = INFLATE_SHARE * step / source.fps
+                while source.read_into(frame):
+                    data = self._store(frame, inflate_limit)
+                    if offset + len(data) + (len(index) + 1) * INDEX_ENTRY.size > self.budget_bytes:
+                        break
+                    f.write(data)
+                    index.append((offset, len(data)))
+                    offset += len(data)
+                    if not all(source.skip() for _ in range(step - 1)):
+                        complete = True
+                        break
+                else:
+                    complete = True
+                if complete:
+                    # Only complete stores get their index and their final name
+                    for entry in index:
+                        f.write(INDEX_ENTRY.pack(*entry))
+                    f.seek(0)
+                    f.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], source.fps / step, len(index), offset))
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        finally:
+            source.close()
+
+        if not complete:
+            os.remove(temp_path)
+            self._mark_too_large(path)
+            self.prune(keep=path)
+            return None
+        os.replace(temp_path, path)
+        self.prune(keep=path)
+        return path
+
+    def _store(self, frame, inflate_limit):
+        # Bytes stored for a frame: compressed, unless that is no smaller or too slow to inflate
+        raw = frame.data.cast("B")
+        data = zlib.compress(raw, COMPRESS_LEVEL)
+        if len(data) >= len(raw):
+            return raw
+        start = time.perf_counter()
+        zlib.decompress(data)
+        if time.perf_counter() - start > inflate_limit:
+            return raw
+        return data
+
+    def build_async(self, video_path, size):
+        """Builds the cache on a background thread, once per key."""
+        path = self.key_path(video_path, size)
+        if not path or os.path.exists(path) or self.too_large(path):
+            return
+        with self.lock:
+            if path in self.building:
+                return
+            self.building.add(path)
+
+        def run():
+            try:
+                self.build(video_path, size)
+            except Exception as e:
+                print(f"Error caching startup video: {e}")
+            finally:
+                with self.lock:
+                    self.building.discard(path)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def prune(self, keep=None):
+        """Deletes every cached video and marker except keep's."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if keep and os.path.splitext(path)[0] == os.path.splitext(keep)[0]:
+                continue
+            if not name.endswith((".frames", ".toolarge")):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass # Still open by a player on Windows, removed next time
@@ -0,0 +1,38 @@
+import json
+import os
+from storage import atomic_write_json
+
+SNAPSHOT_VERSION = 1
+
+class LibrarySnapshot:
+    """
+    The first screen of the library as it was last shown: category names and the
+    top rows of the default view with their display strings and icon paths.
+    A snapshot is only used if the games storage hasn't changed since it was saved
+    and the language is the same, otherwise the library is built from the data.
+    """
+    def __init__(self, path="library_snapshot.json"):
+        self.path = path
+
+    def load(self, storage_mtime, language):
+        """Returns {"categories": [...], "rows": [...]} or None if there is no valid snapshot."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("storage_mtime") != storage_mtime
+                or snapshot.get("language") != language):
+            return None
+        return snapshot
+
+    def save(self, storage_mtime, language, categories, rows):
+        atomic_write_json(self.path, {
+            "version": SNAPSHOT_VERSION,
+            "storage_mtime": storage_mtime,
+            "language": language,
+            "categories": categories,
+            "rows": rows
+        })